@@ -0,0 +1,394 @@
+#-------------------------------------------------------------------------
+#
+#  File Name   :  ArffAsync
+#
+#  Description :
+#
+#   This module contains the class 'ArffAsync' with asyncio variants of
+#   loading, saving and iterating ARFF files.  The file I/O and the par-
+#   sing run in a bounded executor (threads or processes), the event loop
+#   is never blocked.  A semaphore limits the jobs in the executor, the
+#   waiting jobs are started in the order of their calls, so many files
+#   load concurrently and a large file occupies only one worker.
+#
+#   Cancellation :  a cancelled load or save returns at once and frees its
+#   slot, the running job itself cannot be interrupted and its result is
+#   dropped.  A cancelled or closed 'aiterRows' stops the reading thread
+#   through an event.
+#
+#   Back-pressure :  'aiterRows' reads ahead at most 'queueSize' batches
+#   of rows, the reading thread waits until the consumer takes them.
+#
+#  This unit contains following functions :
+#   of ArffAsync :
+#    aiterRows                 aloadArff                 asaveArff
+#    getDefault                loadFile
+#
+#  This class contains following member functions :
+#   of ArffAsync :
+#    ArffAsync                 aiterRows                 aloadArff
+#    asaveArff                 close                     getExecutor
+#    getSemaphore              putBatches                run
+#
+#-------------------------------------------------------------------------
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import weakref
+
+from ArffConv import ArffConv
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  loadFile  of  ArffAsync
+#
+#  Description :
+#
+#   This function loads one ARFF file with the given options of loadArff
+#   and returns the instance.  It runs in the executor, in a worker pro-
+#   cess the raw data lines are dropped before the instance is returned,
+#   they are built from the data frame if needed (see ArffConv.getData).
+#
+#-------------------------------------------------------------------------
+
+def loadFile ( fileName : str, options : dict, dropLines : bool = False ) :
+
+  arff = ArffConv ()
+  arff.setFileName (fileName)
+
+  if not arff.loadArff ( **options ) :
+    return None
+
+  if dropLines and ( arff.dataFrame is not None ) :
+    arff.dataList = []
+
+  return arff
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  ArffAsync
+#
+#  Description :
+#
+#   This class runs the functions of 'ArffConv' in a bounded executor for
+#   asyncio.  With 'processes' files are loaded in worker processes (the
+#   parsing runs in parallel, the data frame is then copied back), other-
+#   wise in threads.  Files are always saved in threads.
+#
+#   Example :
+#    async with ArffAsync ( workers = 4 ) as runner :
+#      arffs = await asyncio.gather ( *[ runner.aloadArff (name)
+#                                        for name in names ] )
+#
+#      async for row in runner.aiterRows ( "Data/iris.arff" ) :
+#        print (row)
+#
+#-------------------------------------------------------------------------
+
+class ArffAsync :
+
+  #  The constructor initializes some variables, the executor is created
+  #  on first use.
+
+  def __init__ ( self, workers : int = 0, processes : bool = False ) :
+
+    self.workers    = workers or min ( 4, os.cpu_count () or 1 )
+    self.processes  = processes  # load in worker processes
+    self.executor   = None       # executor for loading
+    self.threads    = None       # executor for saving and iterating
+    self.semaphores = weakref.WeakKeyDictionary ()   # one per event loop
+    self.lock       = threading.Lock ()
+
+
+  async def __aenter__ (self) :
+
+    return self
+
+
+  async def __aexit__ ( self, excType, excValue, traceback ) :
+
+    self.close ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getExecutor  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function returns the executor for loading (processes) or the
+  #   thread pool, both are created on first use.
+  #
+  #-------------------------------------------------------------------------
+
+  def getExecutor ( self, processes : bool = False ) :
+
+    with self.lock :
+      if self.threads is None :
+        self.threads = concurrent.futures.ThreadPoolExecutor (
+                         self.workers, thread_name_prefix = "ArffAsync" )
+
+      if processes and ( self.executor is None ) :
+        self.executor = concurrent.futures.ProcessPoolExecutor (self.workers)
+
+      return self.executor if processes else self.threads
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getSemaphore  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function returns the semaphore which limits the jobs of the
+  #   running event loop to the number of workers.
+  #
+  #-------------------------------------------------------------------------
+
+  def getSemaphore (self) -> asyncio.Semaphore :
+
+    loop = asyncio.get_running_loop ()
+
+    semaphore = self.semaphores.get (loop)
+
+    if semaphore is None :
+      semaphore = asyncio.Semaphore (self.workers)
+      self.semaphores [loop] = semaphore
+
+    return semaphore
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  run  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function waits for a free slot and runs the function in the
+  #   executor.  The slot is freed when the job ends or the call is can-
+  #   celled.
+  #
+  #-------------------------------------------------------------------------
+
+  async def run ( self, func, *args, processes : bool = False ) :
+
+    async with self.getSemaphore () :
+      loop = asyncio.get_running_loop ()
+
+      return await loop.run_in_executor ( self.getExecutor (processes),
+                                          func, *args )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  aloadArff  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function loads an ARFF file with the given options of loadArff
+  #   off the event loop and returns the 'ArffConv' instance, None if the
+  #   file cannot be loaded.
+  #
+  #-------------------------------------------------------------------------
+
+  async def aloadArff ( self, fileName : str, **options ) :
+
+    return await self.run ( loadFile, fileName, options, self.processes,
+                            processes = self.processes )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  asaveArff  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function saves the content of the given instance in ARFF format
+  #   off the event loop (see ArffConv.saveArff).  The instance must not be
+  #   changed until the save is done.
+  #
+  #-------------------------------------------------------------------------
+
+  async def asaveArff ( self, arff : ArffConv, fileName : str = "",
+                        **options ) -> bool :
+
+    return await self.run ( lambda : arff.saveArff ( fileName, **options ) )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  aiterRows  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function is an asynchronous generator which yields the data rows
+  #   of an ARFF file one by one (see ArffConv.iterRows).  A thread reads
+  #   the rows in batches of 'batchSize' into a queue with at most
+  #   'queueSize' batches.  The thread stops when the generator is closed
+  #   or cancelled.
+  #
+  #-------------------------------------------------------------------------
+
+  async def aiterRows ( self, fileName : str, withWeight : bool = False,
+                        batchSize : int = 1000, queueSize : int = 4 ) :
+
+    loop  = asyncio.get_running_loop ()
+    queue = asyncio.Queue (queueSize)
+    stop  = threading.Event ()
+
+    async with self.getSemaphore () :
+      reader = loop.run_in_executor ( self.getExecutor (), self.putBatches,
+                                      loop, queue, stop, fileName,
+                                      withWeight, batchSize )
+      try :
+        while True :
+          batch = await queue.get ()
+
+          if batch is None :      # end of the file
+            break
+
+          for row in batch :
+            yield row
+
+        await reader          # raises an error of the reading thread
+
+      finally :
+        stop.set ()
+
+        if not reader.done () :
+          reader.cancel ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  putBatches  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function reads the rows of an ARFF file in a thread and puts
+  #   them in batches into the queue of the event loop.  It waits while the
+  #   queue is full and stops when the event is set.  None marks the end.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def putBatches ( loop, queue : asyncio.Queue, stop : threading.Event,
+                   fileName : str, withWeight : bool, batchSize : int ) :
+
+    def put (item) -> bool :
+
+      future = asyncio.run_coroutine_threadsafe ( queue.put (item), loop )
+
+      while True :
+        try :
+          future.result ( timeout = 0.1 )
+          return True
+
+        except concurrent.futures.TimeoutError :
+          if stop.is_set () :
+            future.cancel ()
+            return False
+
+    arff = ArffConv ()
+    arff.setFileName (fileName)
+
+    batch = []
+
+    try :
+      for row in arff.iterRows (withWeight) :
+        batch.append (row)
+
+        if len (batch) >= batchSize :
+          if stop.is_set () or not put (batch) :
+            return
+
+          batch = []
+
+      if batch and not put (batch) :
+        return
+
+    finally :
+      if not stop.is_set () :
+        put (None)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  close  of  ArffAsync
+  #
+  #  Description :
+  #
+  #   This function shuts the executors down, running jobs are finished.
+  #
+  #-------------------------------------------------------------------------
+
+  def close (self) :
+
+    with self.lock :
+      for executor in ( self.executor, self.threads ) :
+        if executor is not None :
+          executor.shutdown ( wait = False, cancel_futures = True )
+
+      self.executor = None
+      self.threads  = None
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  getDefault  of  ArffAsync
+#
+#  Description :
+#
+#   This function returns the shared instance of 'ArffAsync' used by the
+#   functions below, it is created on first use.
+#
+#-------------------------------------------------------------------------
+
+_default     = None
+_defaultLock = threading.Lock ()
+
+def getDefault () -> ArffAsync :
+
+  global _default
+
+  with _defaultLock :
+    if _default is None :
+      _default = ArffAsync ()
+
+    return _default
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  aloadArff, asaveArff, aiterRows  of  ArffAsync
+#
+#  Description :
+#
+#   These functions call the member functions of the shared instance.
+#
+#   Example :
+#    arff = await ArffAsync.aloadArff ( "Data/iris.arff", engine = "c" )
+#
+#-------------------------------------------------------------------------
+
+async def aloadArff ( fileName : str, **options ) :
+
+  return await getDefault ().aloadArff ( fileName, **options )
+
+
+async def asaveArff ( arff : ArffConv, fileName : str = "",
+                      **options ) -> bool :
+
+  return await getDefault ().asaveArff ( arff, fileName, **options )
+
+
+async def aiterRows ( fileName : str, withWeight : bool = False,
+                      batchSize : int = 1000, queueSize : int = 4 ) :
+
+  async for row in getDefault ().aiterRows ( fileName, withWeight,
+                                             batchSize, queueSize ) :
+    yield row
@@ -0,0 +1,291 @@
+#-------------------------------------------------------------------------
+#
+#  File Name   :  ArffBatch
+#
+#  Description :
+#
+#   This module contains the class  'ArffBatch' which converts all files
+#   of a directory tree between ARFF and  csv.  The files are found with
+#   'FileUtils.findRecursive' and converted in  a pool of worker processes.
+#   Files whose output is newer than the input are skipped.
+#
+#   Supported conversions (target) :
+#    csv      : ARFF file  --> csv file (comma separated, with header)
+#    arff     : csv file   --> ARFF file  or  ARFF file --> dense ARFF file
+#    sparse   : ARFF file  --> ARFF file in the sparse format
+#
+#   Usage as command :
+#    python ArffBatch.py <start dir> [--out <dir>] [--to csv|arff|sparse]
+#                        [--from arff|csv] [--workers <n>] [--force]
+#
+#  This unit contains following functions :
+#   of ArffBatch :
+#    convertFile               main
+#
+#  This class contains following member functions :
+#   of ArffBatch :
+#    ArffBatch                 getJobs                   getResult
+#    isUpToDate                run
+#
+#-------------------------------------------------------------------------
+
+import argparse
+import collections
+import concurrent.futures
+import os
+
+import pandas as pd
+
+from FileUtils import FileUtils
+from ArffConv import ArffConv
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  convertFile  of  ArffBatch
+#
+#  Description :
+#
+#   This function converts one file and returns the result as tuple. It
+#   runs in the worker processes, errors are returned and not raised.
+#
+#  Output parameter :
+#   (tuple)         : input name, output name, status ( "converted" or
+#                     "failed" ) and message
+#
+#-------------------------------------------------------------------------
+
+def convertFile ( srcName : str, dstName : str, target : str ) -> tuple :
+
+  try :
+    dstDir = os.path.dirname (dstName)
+
+    if dstDir :
+      os.makedirs ( dstDir, exist_ok = True )
+
+    arff = ArffConv ()
+
+    if srcName.lower ().endswith ( ".csv" ) :
+      dataFrame = pd.read_csv (srcName)
+
+      name = os.path.splitext ( os.path.basename (srcName) ) [0]
+
+      arff.setDataFrame (dataFrame)
+      arff.setDescription (name)
+    else :
+      arff.setFileName (srcName)
+
+      if not arff.loadArff () :
+        return srcName, dstName, "failed", "cannot load the file"
+
+    if target == "csv" :
+      ok = arff.saveDataFrame (dstName)
+    else :
+      ok = arff.saveArff ( dstName, sparse = ( target == "sparse" ) )
+
+    if ok is False :
+      return srcName, dstName, "failed", "cannot save the file"
+
+  except Exception as exc :     # report every error of a single file
+    return srcName, dstName, "failed", str (exc)
+
+  return srcName, dstName, "converted", ""
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  ArffBatch
+#
+#  Description :
+#
+#   This class converts the files of a directory tree in parallel.  The
+#   results are reported in the order of the (sorted) input files.
+#
+#   Example :
+#    batch = ArffBatch ( workers = 8 )
+#
+#    for src, dst, status, msg in batch.run ( "Data", "Out", target = "csv" ) :
+#      print ( status, src )
+#
+#-------------------------------------------------------------------------
+
+class ArffBatch :
+
+  #  The constructor initializes some variables.
+
+  def __init__ ( self, workers : int = 0, force : bool = False ) :
+
+    self.workers = workers or os.cpu_count () or 1
+    self.force   = force       # convert also up-to-date files
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getJobs  of  ArffBatch
+  #
+  #  Description :
+  #
+  #   This function searches the input files below the start directory and
+  #   returns a list of tuples (input name, output name).  The outputs are
+  #   placed in the output directory  with the same relative path, or next
+  #   to the inputs if no output directory is given.
+  #
+  #-------------------------------------------------------------------------
+
+  def getJobs ( self, startDir : str, outDir : str = "",
+                source : str = "arff", target : str = "csv" ) -> list :
+
+    files = FileUtils.findRecursive ( [ "*." + source ], startDir )
+    files.sort ()
+
+    ext  = ".csv" if target == "csv" else ".arff"
+    jobs = []
+
+    for srcName in files :
+      dstName = os.path.splitext (srcName) [0] + ext
+
+      if outDir :
+        dstName = os.path.join ( outDir, os.path.relpath ( dstName,
+                                                           startDir ) )
+
+      jobs.append ( ( srcName, dstName.replace ( "\\", "/" ) ) )
+
+    return jobs
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  isUpToDate  of  ArffBatch
+  #
+  #  Description :
+  #
+  #   This function checks if the output exists and is not older than the
+  #   input.
+  #
+  #-------------------------------------------------------------------------
+
+  def isUpToDate ( self, srcName : str, dstName : str ) -> bool :
+
+    if self.force or not os.path.exists (dstName) :
+      return False
+
+    return os.path.getmtime (dstName) >= os.path.getmtime (srcName)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  run  of  ArffBatch
+  #
+  #  Description :
+  #
+  #   This function is a generator which converts all files below the start
+  #   directory and yields the results (see convertFile) in the order of the
+  #   input files.  Not more than twice the number of workers  files are
+  #   submitted at the same time, up-to-date files are reported as
+  #   "skipped".
+  #
+  #-------------------------------------------------------------------------
+
+  def run ( self, startDir : str, outDir : str = "", source : str = "arff",
+            target : str = "csv" ) :
+
+    if target not in ( "csv", "arff", "sparse" ) :
+      raise ValueError ( "Unsupported target format : " + target )
+
+    jobs = self.getJobs ( startDir, outDir, source, target )
+
+    pending = collections.deque ()
+
+    with concurrent.futures.ProcessPoolExecutor (self.workers) as executor :
+
+      for srcName, dstName in jobs :
+
+        if os.path.abspath (srcName) == os.path.abspath (dstName) :
+          result = ( srcName, dstName, "failed",
+                     "output would overwrite the input" )
+        elif self.isUpToDate ( srcName, dstName ) :
+          result = ( srcName, dstName, "skipped", "" )
+        else :
+          result = executor.submit ( convertFile, srcName, dstName, target )
+
+        pending.append (result)
+
+        while len (pending) > 2 * self.workers :    # bounded concurrency
+          yield self.getResult ( pending.popleft () )
+
+      while pending :
+        yield self.getResult ( pending.popleft () )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getResult  of  ArffBatch
+  #
+  #  Description :
+  #
+  #   This function waits for the result of a submitted file.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def getResult (result) -> tuple :
+
+    if isinstance ( result, concurrent.futures.Future ) :
+      return result.result ()
+
+    return result
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  main  of  ArffBatch
+#
+#  Description :
+#
+#   This function evaluates the command line arguments and converts all
+#   files.  It returns the number of failed files.
+#
+#-------------------------------------------------------------------------
+
+def main ( args : list = None ) -> int :
+
+  parser = argparse.ArgumentParser (
+             description = "Convert all files of a directory tree between "
+                           "ARFF and csv." )
+
+  parser.add_argument ( "startDir", help = "directory to search" )
+  parser.add_argument ( "--out", default = "",
+                        help = "output directory (default: next to input)" )
+  parser.add_argument ( "--from", dest = "source", default = "arff",
+                        choices = [ "arff", "csv" ], help = "input format" )
+  parser.add_argument ( "--to", dest = "target", default = "csv",
+                        choices = [ "csv", "arff", "sparse" ],
+                        help = "output format" )
+  parser.add_argument ( "--workers", type = int, default = 0,
+                        help = "number of processes (default: cpu count)" )
+  parser.add_argument ( "--force", action = "store_true",
+                        help = "convert also up-to-date files" )
+
+  opts = parser.parse_args (args)
+
+  batch  = ArffBatch ( opts.workers, opts.force )
+  failed = 0
+
+  for srcName, dstName, status, msg in batch.run ( opts.startDir, opts.out,
+                                                   opts.source,
+                                                   opts.target ) :
+    text = status.ljust (10) + srcName + " --> " + dstName
+
+    if msg :
+      text = text + " : " + msg
+
+    print (text)
+
+    if status == "failed" :
+      failed = failed + 1
+
+  return failed
+
+
+if __name__ == "__main__" :
+  raise SystemExit ( main () )
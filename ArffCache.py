@@ -0,0 +1,380 @@
+#-------------------------------------------------------------------------
+#
+#  File Name   :  ArffCache
+#
+#  Description :
+#
+#   This module contains  the class 'ArffCache' which  stores the parsed
+#   data of  ARFF files in  a binary form  in a cache  directory.  Every
+#   column is written as numpy file (.npy), strings are stored as codes
+#   with a list of the unique values.  A later load of an unchanged file
+#   maps the numpy files into memory instead of parsing the text again.
+#
+#   An entry is valid as  long as size and modification time  of the ARFF
+#   file are unchanged (optional also the  content hash).  Stale entries
+#   are removed,  and the least  recently used entries are evicted if the
+#   cache grows above the maximum size.  The load options which change the
+#   parsed data (e.g. downcast) are stored with the entry and must match.
+#
+#  This class contains following member functions :
+#   of ArffCache :
+#    ArffCache                 evict                     getEntryDir
+#    getHash                   isValid                   load
+#    readColumn                remove                    store
+#    writeColumn
+#
+#-------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  ArffCache
+#
+#  Description :
+#
+#   This class implements a persistent cache of parsed ARFF files.
+#
+#   Example :
+#    cache = ArffCache ( "/tmp/arffcache", maxSize = 2**30 )
+#
+#    entry = cache.load ( "Data/iris.arff" )
+#
+#    if entry is None :
+#      ...   # parse the file
+#      cache.store ( "Data/iris.arff", relation, attributes, dataFrame )
+#
+#-------------------------------------------------------------------------
+
+class ArffCache :
+
+  #  The constructor creates the cache directory if necessary
+
+  def __init__ ( self, cacheDir : str, maxSize : int = 2**30,
+                 useHash : bool = False ) :
+
+    self.cacheDir = cacheDir
+    self.maxSize  = maxSize    # maximum size of all entries in bytes
+    self.useHash  = useHash    # compare also the content hash of the file
+
+    os.makedirs ( cacheDir, exist_ok = True )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getEntryDir  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function returns  the directory of the  cache entry for the given
+  #   ARFF file.  The name is the hash of the absolute path.
+  #
+  #-------------------------------------------------------------------------
+
+  def getEntryDir ( self, fileName : str ) -> str :
+
+    path = os.path.abspath (fileName)
+    name = hashlib.sha1 ( path.encode ( "utf8" ) ).hexdigest ()
+
+    return os.path.join ( self.cacheDir, name )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getHash  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function returns the sha1 hash of the content of the given file.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def getHash ( fileName : str ) -> str :
+
+    sha = hashlib.sha1 ()
+
+    with open ( fileName, "rb" ) as hfile :
+      for block in iter ( lambda : hfile.read ( 2**20 ), b"" ) :
+        sha.update (block)
+
+    return sha.hexdigest ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  isValid  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function checks if the  given meta data of a cache entry matches
+  #   the ARFF file.  If only the modification time differs and the content
+  #   hash is used, the hash decides.
+  #
+  #-------------------------------------------------------------------------
+
+  def isValid ( self, meta : dict, fileName : str ) -> bool :
+
+    stat = os.stat (fileName)
+
+    if meta.get ( "size" ) != stat.st_size :
+      return False
+
+    if meta.get ( "mtime" ) == stat.st_mtime_ns :
+      return True
+
+    if self.useHash and meta.get ( "hash" ) :
+      return meta ["hash"] == self.getHash (fileName)
+
+    return False
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  load  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function returns the cached  data of the given ARFF file as tuple
+  #   (relation, attributes, data frame) or None if there is no valid entry.
+  #   Numeric columns are memory-mapped (copy on write).  A stale entry is
+  #   removed,  an entry stored with other options is ignored (and replaced
+  #   by the next store).
+  #
+  #-------------------------------------------------------------------------
+
+  def load ( self, fileName : str, options : dict = None ) :
+
+    entryDir = self.getEntryDir (fileName)
+    metaName = os.path.join ( entryDir, "meta.json" )
+
+    try :
+      with open ( metaName, "r", encoding = "utf8" ) as hfile :
+        meta = json.load (hfile)
+
+      if not self.isValid ( meta, fileName ) :
+        self.remove (entryDir)
+        return None
+
+      if meta.get ( "options", {} ) != ( options or {} ) :
+        return None
+
+      columns = {}
+
+      for info in meta ["columns"] :
+        columns [ info ["name"] ] = self.readColumn ( entryDir, info )
+
+    except ( OSError, ValueError, KeyError ) :
+      return None
+
+    os.utime (metaName)       # last access for the eviction
+
+    dataFrame = pd.DataFrame ( columns, copy = False )
+
+    return meta ["relation"], meta ["attributes"], dataFrame
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  store  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function  writes the given data  of the ARFF file  as new cache
+  #   entry.  The entry is written into a temporary directory first and
+  #   then renamed, so concurrent loads never see a half written entry.
+  #   Data frames with unsupported column types (e.g. sparse) are not
+  #   cached.  The options are the load options used to parse the data.
+  #
+  #-------------------------------------------------------------------------
+
+  def store ( self, fileName : str, relation : str, attributes : list,
+              dataFrame, options : dict = None ) -> bool :
+
+    stat = os.stat (fileName)
+
+    meta = { "path"       : os.path.abspath (fileName),
+             "size"       : stat.st_size,
+             "mtime"      : stat.st_mtime_ns,
+             "hash"       : self.getHash (fileName) if self.useHash else "",
+             "relation"   : relation,
+             "attributes" : attributes,
+             "options"    : options or {},
+             "columns"    : [] }
+
+    tmpDir = tempfile.mkdtemp ( dir = self.cacheDir, prefix = "tmp_" )
+
+    try :
+      for col in range ( 0, len (dataFrame.columns) ) :
+        name = dataFrame.columns [col]
+        info = self.writeColumn ( tmpDir, col, dataFrame [name] )
+
+        if info is None :      # column type not supported
+          shutil.rmtree ( tmpDir, ignore_errors = True )
+          return False
+
+        info ["name"] = name
+        meta ["columns"].append (info)
+
+      with open ( os.path.join ( tmpDir, "meta.json" ), "w",
+                  encoding = "utf8" ) as hfile :
+        json.dump ( meta, hfile )
+
+      entryDir = self.getEntryDir (fileName)
+
+      self.remove (entryDir)
+      os.rename ( tmpDir, entryDir )
+
+    except ( OSError, TypeError, ValueError ) :
+      shutil.rmtree ( tmpDir, ignore_errors = True )
+      return False
+
+    self.evict ()
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  writeColumn  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function writes one column as numpy file and returns the meta
+  #   data of the column.  Columns of numbers, dates and times are written
+  #   directly, all other values as codes plus the list of unique values.
+  #
+  #-------------------------------------------------------------------------
+
+  def writeColumn ( self, entryDir : str, col : int, column ) -> dict :
+
+    name  = "col_" + str (col) + ".npy"
+    path  = os.path.join ( entryDir, name )
+    dtype = column.dtype
+
+    if isinstance ( dtype, pd.SparseDtype ) :
+      return None
+
+    if isinstance ( dtype, pd.CategoricalDtype ) :
+      np.save ( path, np.asarray ( column.cat.codes ) )
+
+      return { "file"       : name,
+               "kind"       : "category",
+               "categories" : column.cat.categories.tolist (),
+               "ordered"    : bool (dtype.ordered) }
+
+    if dtype.kind in "fiubmM" :
+      np.save ( path, column.to_numpy () )
+
+      return { "file" : name, "kind" : "array" }
+
+    if dtype.kind != "O" :
+      return None
+
+    codes, uniques = pd.factorize ( column, use_na_sentinel = True )
+
+    np.save ( path, codes )
+
+    return { "file"    : name,
+             "kind"    : "codes",
+             "uniques" : [ str (value) for value in uniques ] }
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readColumn  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function reads one column written by 'writeColumn'.
+  #
+  #-------------------------------------------------------------------------
+
+  def readColumn ( self, entryDir : str, info : dict ) :
+
+    path   = os.path.join ( entryDir, info ["file"] )
+    values = np.load ( path, mmap_mode = "c" )
+
+    if info ["kind"] == "array" :
+      return values
+
+    if info ["kind"] == "category" :
+      return pd.Categorical.from_codes ( values, info ["categories"],
+                                         ordered = info ["ordered"] )
+
+    # the last entry is used for missing values with code -1
+    uniques = np.empty ( len ( info ["uniques"] ) + 1, dtype = object )
+    uniques [ 0 : -1 ] = info ["uniques"]
+    uniques [-1]       = None
+
+    return uniques.take (values)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  remove  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function removes the given entry directory.
+  #
+  #-------------------------------------------------------------------------
+
+  def remove ( self, entryDir : str ) :
+
+    shutil.rmtree ( entryDir, ignore_errors = True )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  evict  of  ArffCache
+  #
+  #  Description :
+  #
+  #   This function removes the least recently used entries until the size
+  #   of all entries is below the maximum size.
+  #
+  #-------------------------------------------------------------------------
+
+  def evict (self) :
+
+    entries = []
+    total   = 0
+
+    for name in os.listdir (self.cacheDir) :
+      entryDir = os.path.join ( self.cacheDir, name )
+      metaName = os.path.join ( entryDir, "meta.json" )
+
+      if name.startswith ( "tmp_" ) :
+        continue
+
+      try :      # entries can be removed by other processes meanwhile
+        size = 0
+
+        for fname in os.listdir (entryDir) :
+          size = size + os.path.getsize ( os.path.join ( entryDir, fname ) )
+
+        atime = os.path.getmtime (metaName)
+
+      except OSError :
+        continue
+
+      entries.append ( ( atime, size, entryDir ) )
+      total = total + size
+
+    entries.sort ()      # oldest access first
+
+    for atime, size, entryDir in entries :
+      if total <= self.maxSize :
+        break
+
+      self.remove (entryDir)
+      total = total - size
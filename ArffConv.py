@@ -36,15 +36,37 @@
 #
 # -------------------------------------------------------------------------
 
+import concurrent.futures
+import csv
+import itertools
+import mmap
 import os
 import re
+import numpy as np
 import pandas as pd
 
+try :
+  import scipy.sparse as sps
+except ImportError :      # only needed to load sparse data
+  sps = None
+
+try :
+  import pyarrow as pa
+  import pyarrow.csv as pacsv
+except ImportError :      # only needed for the engine "pyarrow"
+  pa    = None
+  pacsv = None
+
 # sys.path.append ( '../../Utils' )
 
-from FileUtils import FileUtils
+from FileUtils import FileUtils, LineStream, READ_ERRORS
 import StringUtils as strUtils
-from SMatrix import SMatrix
+from ArffParser import ArffParser, getAttrKind, getCategories, parseRange
+from ArffParser import evalWhere, formatDates, getConditions, getIntType
+from ArffParser import cleanValue, parseDates, splitValues
+from ArffParser import translateDateFormat
+from ArffIndex import ArffIndex
+from ArffCache import ArffCache
 
 
 #-------------------------------------------------------------------------
@@ -72,12 +94,28 @@ class ArffConv :
     self.dataType    = []       # list of maps with information (datatype)
     self.header      = []       # header of the arff file (string list)
     self.isValid     = False    # data and header format is correct or not
-    self.attrChanged = False    # an attribute was explicitly changed
+    self.dataChanged = False    # data list set by setData, saved as it is
     self.fileName    = ""
     self.delimiter   = ","
+    self.sparseMat   = None     # data as scipy csr matrix (sparse loading)
+    self.weights     = None     # weights of the instances (sparse loading)
+    self.pendingLoad = None     # options of a lazy load, data not yet read
 
     self.fileUtils   = FileUtils ()
-    self.strMatrix   = SMatrix ()
+    self.rowIndex    = None     # byte offset index for readRows
+    self.rowHeader   = None     # header of the indexed file (ArffConv)
+    self.cache       = None     # binary parse cache (ArffCache)
+
+    # saveArff writes sparse lines below this density (sparse = "auto")
+    self.sparseThreshold = 0.5
+    self.maxNominal      = 1000   # more distinct values give a string attribute
+    self.downcast        = False  # smaller numeric types (see loadArff)
+    self.columns         = None   # names of the loaded attributes (loadArff)
+    self.where           = None   # row filter of loadArff (see evalWhere)
+
+    # sample budget for the type inference of setDataFrame ( 0 = all rows )
+    self.sampleRows     = 0
+    self.sampleFraction = 0.0
 
 
   # The destructor does nothing for now
@@ -95,7 +133,8 @@ class ArffConv :
   #
   #  Description :
   #
-  #   This function initializes some member variables.
+  #   This function initializes some member variables.  The file name is
+  #   kept.
   #
   #-------------------------------------------------------------------------
 
@@ -109,9 +148,11 @@ class ArffConv :
     self.dataType    = []       # list of maps with information (datatype)
     self.header      = []       # header of the arff file (string list)
     self.isValid     = False    # data and header format is correct or not
-    self.attrChanged = False    # an attribute was explicitly changed
-    self.fileName    = ""
+    self.dataChanged = False    # data list set by setData, saved as it is
     self.delimiter   = ","
+    self.sparseMat   = None     # data as scipy csr matrix (sparse loading)
+    self.weights     = None     # weights of the instances (sparse loading)
+    self.pendingLoad = None     # options of a lazy load, data not yet read
 
 
   #-------------------------------------------------------------------------
@@ -121,71 +162,421 @@ class ArffConv :
   #  Description :
   #
   #   This function converts the header and  data lists into a pandas data
-  #   frame.  This  is done by preparing  a csv file with  attribute names
-  #   and data let pandas read it.
+  #   frame.  The attribute names and the data lines are read by pandas as
+  #   csv text through a 'LineStream', no temporary file is written and
+  #   the data list is not changed.
   #
   #-------------------------------------------------------------------------
 
   def convData (self) :
 
-    tmpName = "tmp_" + os.path.basename (self.fileName) + ".dat"
-    self.fileUtils.setFileName (tmpName)
-
     header = self.delimiter.join ( self.attrNames )
 
-    data : list = self.dataList
-    data.insert ( 0, header )
+    lines = itertools.chain ( [ header ], self.dataList )
 
-    ok = self.fileUtils.writeFile (data)
+    self.dataFrame = pd.read_csv ( LineStream (lines), sep = self.delimiter )
 
-    if not ok :
-      return ok
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  buildData  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function converts  the data list into a pandas  data frame. The
+  #   data section is parsed once by an  'ArffParser' directly into typed
+  #   columns.  For sparse data, data with weights or a selection of columns
+  #   or rows the data list is built again from the data frame in the dense
+  #   format (see getData),  the weights are then the last column.
+  #
+  #-------------------------------------------------------------------------
+
+  def buildData (self) -> bool :
 
-    # restore original filename
-    self.fileUtils.setFileName (self.fileName)
+    if not self.attrNames :
+      return False
 
-    self.dataFrame = pd.read_csv ( tmpName, sep = self.delimiter )
+    index  = self.getColumnIndex ()
+    parser = ArffParser ( self.attributes, self.downcast, index, self.where )
+    parser.parseLines (self.dataList)
 
-    os.remove (tmpName)
+    self.selectColumns (index)
 
-    return ok
+    if ( index is not None ) or ( self.where is not None ) or \
+       parser.sparse or parser.weight :
+      self.dataList = []      # built from the data frame (see getData)
+
+    if parser.weight :
+      self.attrNames.append ( "weight" )
+      info : dict = { "name" : "weight", "arffType" : "real" }
+      self.attributes.append (info)
+
+    self.delimiter = ","    # make sure it is Arff delimiter
+
+    self.dataFrame = parser.getDataFrame ()
+
+    self.convArffTypes ()    # data frame must already exist
+
+    return True
 
 
   #-------------------------------------------------------------------------
   #
-  #  Member function :  buildData  of  ArffConv
+  #  Member function :  buildSparse  of  ArffConv
   #
   #  Description :
   #
-  #   This function converts the header and  data lists into a pandas data
-  #   frame.  This  is done by preparing  a csv file with  attribute names
-  #   and data let pandas read it.
+  #   This function converts the data list  of a sparse ARFF file directly
+  #   into a  scipy csr matrix. If 'asFrame' is set,  also a pandas data
+  #   frame with sparse columns (pd.SparseDtype) is  built from the matrix.
+  #   Values of nominal attributes are stored as codes (index of the value
+  #   in the declaration).  Weights are stored separately as numpy array
+  #   (see getWeights), the data frame has only the declared attributes.
   #
   #-------------------------------------------------------------------------
 
-  def buildData (self) -> bool :
+  def buildSparse ( self, asFrame : bool = True ) -> bool :
 
-    if ( not self.dataList ) or ( not self.attrNames ) :
+    if sps is None :
+      raise ImportError ( "Loading sparse data requires scipy" )
+
+    if not self.attrNames :
       return False
 
-    changed = self.parseData ( self.dataList )
+    index  = self.getColumnIndex ()
+    parser = ArffParser ( self.attributes, columns = index,
+                          where = self.where )
 
-    if changed :
-      self.dataList = self.strMatrix.toText ()
+    data, indices, indptr, self.weights = parser.parseSparse (self.dataList)
 
-    self.delimiter = ","    # make sure it is Arff delimiter
+    self.selectColumns (index)
 
-    values = self.strMatrix.getDataTuples ()
+    shape = ( parser.nRows (), len (self.attrNames) )
 
-    self.dataFrame = pd.DataFrame ( values, columns = self.attrNames )
+    self.sparseMat = sps.csr_matrix ( ( data, indices, indptr ),
+                                      shape = shape )
 
-    self.convArffTypes ()    # data frame must already exist
+    if index is not None :
+      self.dataList = []      # built from the matrix (see getData)
+
+    self.dataFrame = None
+
+    if asFrame :
+      self.dataFrame = pd.DataFrame.sparse.from_spmatrix ( self.sparseMat,
+                                            columns = self.attrNames )
+
+    for col in range ( 0, len (self.attributes) ) :
+      info = self.attributes [col]
+      info ["dataType"] = "Sparse[float64, 0]"
+
+      if parser.kinds [col] == "nominal" :
+        info ["categories"] = parser.categories [col]
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getSparseMatrix  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the data  as scipy csr matrix if the ARFF file
+  #   was loaded in sparse mode, otherwise None.
+  #
+  #-------------------------------------------------------------------------
+
+  def getSparseMatrix (self) :
+
+    return self.sparseMat
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getWeights  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the  weights of the instances as numpy array if
+  #   the ARFF file  was loaded in sparse mode  and contains  weights, other-
+  #   wise None.
+  #
+  #-------------------------------------------------------------------------
+
+  def getWeights (self) :
+
+    return self.weights
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  buildParallel  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function parses the data section with several worker processes.
+  #   The  data section is  split into byte ranges  which end at  a line
+  #   border, every range is parsed  by an 'ArffParser' in a worker with
+  #   the attributes of the header.  The typed  columns of the ranges are
+  #   then concatenated in the original order.  The data list is not kept,
+  #   it is built from the data frame if needed (see getData).
+  #
+  #-------------------------------------------------------------------------
+
+  def buildParallel ( self, workers : int ) -> bool :
+
+    lines = self.fileUtils.iterLines ()
+    found = self.readHeader (lines)
+    lines.close ()
+
+    if not found :
+      return False
+
+    with open ( self.fileName, "rb" ) as hfile :
+      start = ArffIndex.findDataOffset (hfile)
+      size  = os.fstat ( hfile.fileno () ).st_size
+
+      # several ranges per worker to balance different line lengths
+      step   = max ( ( size - start ) // ( workers * 4 ), 2**20 )
+      bounds = [ start ]
+
+      while bounds [-1] < size :
+        hfile.seek ( bounds [-1] + step )
+        hfile.readline ()     # move to the next line border
+
+        bounds.append ( min ( hfile.tell (), size ) )
+
+    # an empty data section gives one empty range (frame with header types)
+    ranges = list ( zip ( bounds [ : -1 ], bounds [ 1 : ] ) ) or \
+             [ ( start, start ) ]
+    index  = self.getColumnIndex ()
+
+    if len (ranges) > 1 :
+      with concurrent.futures.ProcessPoolExecutor (workers) as executor :
+        futures = [ executor.submit ( parseRange, self.fileName, first,
+                                      last, self.attributes, self.downcast,
+                                      index, self.where )
+                    for first, last in ranges ]
+
+        results = [ future.result () for future in futures ]
+    else :
+      results = [ parseRange ( self.fileName, first, last, self.attributes,
+                               self.downcast, index, self.where )
+                  for first, last in ranges ]
+
+    self.selectColumns (index)
+
+    frames = [ result [0] for result in results ]
+    weight = any ( result [1] for result in results )
+
+    # values not declared in the header give different categories per range
+    for name in frames [0].columns :
+      if isinstance ( frames [0] [name].dtype, pd.CategoricalDtype ) :
+        categories = list ( dict.fromkeys (
+                       value for frame in frames
+                             for value in frame [name].cat.categories ) )
+
+        for frame in frames :
+          frame [name] = frame [name].cat.set_categories (categories)
+
+    self.dataFrame = pd.concat ( frames, ignore_index = True )
+
+    if weight :
+      self.attrNames.append ( "weight" )
+      info : dict = { "name" : "weight", "arffType" : "real" }
+      self.attributes.append (info)
+    else :
+      self.dataFrame = self.dataFrame.drop ( columns = "weight" )
+
+    self.delimiter = ","
+    self.dataList  = []
+
+    self.convArffTypes ()
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  buildCsv  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads the data section with the csv reader of pandas
+  #   (engine "c") or of pyarrow (engine "pyarrow").  The data section is
+  #   handed over by its byte offset, the names and types of the columns
+  #   are taken from the header.  It returns false without reading if the
+  #   data section contains sparse or weighted lines (braces) or both quote
+  #   characters,  these files must  be parsed  by 'buildData'.  The  c
+  #   engine is used instead of pyarrow for comments, escapes or blanks
+  #   after the delimiter which pyarrow does not support.
+  #
+  #-------------------------------------------------------------------------
+
+  def buildCsv ( self, engine : str = "c" ) -> bool :
+
+    if ( engine == "pyarrow" ) and ( pacsv is None ) :
+      raise ImportError ( "The engine pyarrow requires pyarrow" )
+
+    lines = self.fileUtils.iterLines ()
+    found = self.readHeader (lines)
+    lines.close ()
+
+    if not found :
+      return False
+
+    with open ( self.fileName, "rb" ) as hfile :
+      start = ArffIndex.findDataOffset (hfile)
+      size  = os.fstat ( hfile.fileno () ).st_size
+
+      if ( start < 0 ) or ( start >= size ) :
+        return False
+
+      with mmap.mmap ( hfile.fileno (), 0, access = mmap.ACCESS_READ ) as data :
+        if data.find ( b"{", start ) >= 0 :
+          return False
+
+        single = data.find ( b"'", start ) >= 0
+        double = data.find ( b'"', start ) >= 0
+
+        if single and double :
+          return False
+
+        if ( data.find ( b"%", start ) >= 0 ) or \
+           ( data.find ( b"\\", start ) >= 0 ) or \
+           ( data.find ( b", ", start ) >= 0 ) :
+          engine = "c"
+
+      quote = "'" if single else '"'
+      index = self.getColumnIndex ()
+
+      hfile.seek (start)
+
+      try :
+        if engine == "pyarrow" :
+          df = self.readArrow ( hfile, quote, index )
+        else :
+          df = self.readCsv ( hfile, quote, index )
+
+      except ( ValueError, pd.errors.ParserError ) :
+        return False      # e.g. a text in a numeric column
+
+    self.selectColumns (index)
+
+    for index in range ( 0, len (self.attributes) ) :
+      if getAttrKind ( self.attributes [index] ["arffType"] ) == "nominal" :
+        name      = self.attrNames [index]
+        df [name] = self.toCategorical ( index, df [name] )
 
-    self.attrChanged = False
+    self.dataFrame = df
+
+    self.delimiter = ","
+    self.dataList  = []
+
+    self.convArffTypes ()
 
     return True
 
 
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readCsv  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads the data lines from the given file handle with
+  #   the c engine of 'pd.read_csv'.  Integer attributes are not typed,
+  #   they may contain missing values.  Missing strings are None.  With
+  #   'columns' only the attributes with these indexes are read.
+  #
+  #-------------------------------------------------------------------------
+
+  def readCsv ( self, hfile, quote : str, columns : list = None ) :
+
+    dtypes     = {}
+    attributes = self.attributes
+
+    if columns is not None :
+      attributes = [ attributes [col] for col in columns ]
+
+    for info in attributes :
+      kind = getAttrKind ( info ["arffType"] )
+
+      if kind == "real" :
+        dtypes [ info ["name"] ] = "float64"
+      elif kind == "nominal" :
+        dtypes [ info ["name"] ] = "category"
+      elif kind != "integer" :
+        dtypes [ info ["name"] ] = "object"
+
+    df = pd.read_csv ( hfile, header = None, names = self.attrNames,
+                       dtype = dtypes, na_values = [ "?" ],
+                       keep_default_na = False, quotechar = quote,
+                       escapechar = "\\", comment = "%",
+                       skipinitialspace = True, encoding = "utf8",
+                       usecols = columns, engine = "c" )
+
+    for name, dtype in dtypes.items () :
+      if dtype == "object" :
+        df [name] = df [name].where ( df [name].notna (), None )
+
+    return df
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readArrow  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads the data lines from the given file handle with
+  #   the csv reader of pyarrow.  The column types are given explicitly, a
+  #   type inference would e.g. convert nominal values TRUE / FALSE to bool.
+  #   Nominal attributes are read as dictionary (categorical).  With
+  #   'columns' only the attributes with these indexes are converted.
+  #
+  #-------------------------------------------------------------------------
+
+  def readArrow ( self, hfile, quote : str, columns : list = None ) :
+
+    names = []
+
+    if columns is not None :
+      names = [ self.attrNames [col] for col in columns ]
+
+    types = {}
+
+    for info in self.attributes :
+      kind = getAttrKind ( info ["arffType"] )
+
+      if kind == "real" :
+        types [ info ["name"] ] = pa.float64 ()
+      elif kind == "nominal" :
+        types [ info ["name"] ] = pa.dictionary ( pa.int32 (), pa.string () )
+      elif kind != "integer" :
+        types [ info ["name"] ] = pa.string ()
+
+    try :
+      table = pacsv.read_csv ( hfile,
+                read_options    = pacsv.ReadOptions (
+                                    column_names = self.attrNames ),
+                parse_options   = pacsv.ParseOptions (
+                                    quote_char = quote,
+                                    ignore_empty_lines = True ),
+                convert_options = pacsv.ConvertOptions (
+                                    include_columns = names,
+                                    column_types = types,
+                                    null_values = [ "?" ],
+                                    strings_can_be_null = True ) )
+
+    except pa.ArrowInvalid as exc :
+      raise ValueError ( str (exc) )
+
+    return table.to_pandas ()
+
+
   #-------------------------------------------------------------------------
   #
   #  Member function :  convArffType  of  ArffConv
@@ -204,20 +595,28 @@ class ArffConv :
   #   data  section as  the  corresponding string  representations of  the
   #   date/time. A simple date format is e.g. "yyyy-MM-dd"
   #
+  #   The column is converted in  the given data frame, default is the data
+  #   frame of this  class.  The function can be  called several times for
+  #   the same attribute, e.g. for every chunk of 'iterDataFrames'.
+  #
   #
   #   Example :
-  #    date     --> datetime64
+  #    date     --> datetime64  ( timedelta64 for a time only like "HH:mm" )
   #    REAL     --> float64
   #    NUMERIC  --> int64
-  #    yes,no   --> object
+  #    {yes,no} --> category  ( categories in the declared order )
+  #    STRING   --> object
   #
   #-------------------------------------------------------------------------
 
-  def convArffType ( self, index ) :
+  def convArffType ( self, index, dataFrame = None ) :
 
     # info is a reference, copy back not necessary
     info = self.attributes [index]
 
+    if dataFrame is None :
+      dataFrame = self.dataFrame
+
     arffType = info ["arffType"].lower ()
     attrName = info ["name"]
 
@@ -232,37 +631,124 @@ class ArffConv :
         dataType = "int64"
         break
 
+      if arffType.startswith ("{") :
+        dataType = "category"
+        column   = dataFrame [attrName]
+
+        if not isinstance ( column.dtype, pd.CategoricalDtype ) :
+          dataFrame [attrName] = self.toCategorical ( index, column )
+        break
+
       if arffType.startswith ("date") :
         dataType = "datetime64"
 
         arffType = info ["arffType"]  # exact case needed, no lower ()
         date = arffType [4:]
+
+        if not date.strip () :    # already converted or default format
+          date = info.get ( "ARFF dateformat", "yyyy-MM-dd'T'HH:mm:ss" )
+
         info ["arffType"] = "date"
 
-        info ["ARFF dateformat"] = date
+        info ["ARFF dateformat"] = date.strip ().strip ( "\"'" )
 
-        date, onlyTime = self.convDateFormat (date)
+        date, onlyTime = translateDateFormat (date)
 
         info ["df dateformat"] = date
 
-        df = self.dataFrame    #  just a reference
+        if onlyTime :
+          dataType = "timedelta64"
 
-        try :     # to_timedelta is not working, only to_datetime
-          df [attrName] = pd.to_datetime ( df [attrName], format=date )
+        df = dataFrame    #  just a reference
+
+        try :
+          df [attrName] = parseDates ( df [attrName], date, onlyTime )
         except :
-          msg = "Cannot convert datatime format : " + arffType [4:]
+          msg = "Cannot convert datatime format : " + info ["ARFF dateformat"]
           print (msg)
 
       break   # exit while if nothing is found, unconditional break
 
+    column = dataFrame [attrName]
+
+    # integer columns with missing or non integral values stay floating point
+    if ( dataType == "int64" ) and column.dtype.kind == "f" and \
+       ( column.isna ().any () or ( column % 1 != 0 ).any () ) :
+      dataType = "float64"
+
+    if self.downcast and ( dataType in ( "float64", "int64" ) ) and \
+       ( column.dtype.kind in "fi" ) :
+      dataType = self.getDowncastType ( column, dataType )
+
     info ["dataType"] = dataType    # type in data frame
 
-    if ( dataType != "datetime64" ) :
-      self.dataFrame [attrName] = self.dataFrame [attrName].astype (dataType)
+    if dataType not in ( "datetime64", "timedelta64", "category" ) :
+      dataFrame [attrName] = column.astype ( dataType, copy = False )
 
     return dataType
 
 
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getDowncastType  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the smaller type of a numeric column for the
+  #   option 'downcast' of loadArff.  Columns already downcast while parsing
+  #   keep their type,  for all others (e.g. from the cache)  the range is
+  #   evaluated here.
+  #
+  #-------------------------------------------------------------------------
+
+  def getDowncastType ( self, column, dataType : str ) -> str :
+
+    if column.dtype.itemsize < 8 :
+      return column.dtype.name
+
+    if dataType == "float64" :
+      if self.downcast in ( True, "float" ) :
+        return "float32"
+
+    elif ( self.downcast in ( True, "integer" ) ) and len (column) :
+      return getIntType ( column.min (), column.max () ).name
+
+    return dataType
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  toCategorical  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function converts  a column with the  values of a nominal  at-
+  #   tribute to a categorical.  The categories keep the declared order of
+  #   the header,  values which are not declared  are appended in the order
+  #   of their first appearance.  The categories of a categorical column
+  #   are put into this order.
+  #
+  #-------------------------------------------------------------------------
+
+  def toCategorical ( self, index : int, column ) :
+
+    info = self.attributes [index]
+
+    categories = list ( dict.fromkeys ( getCategories ( info ["arffType"] ) ) )
+
+    if isinstance ( column.dtype, pd.CategoricalDtype ) :
+      known = set (categories)
+      extra = [ value for value in column.cat.categories
+                if value not in known ]
+
+      return column.cat.set_categories ( categories + extra )
+
+    values = column [ column.notna () ]
+    extra  = pd.unique ( values [ ~ values.isin (categories) ] )
+
+    return pd.Categorical ( column, categories = categories + list (extra) )
+
+
   #-------------------------------------------------------------------------
   #
   #  Member function :  convArffTypes  of  ArffConv
@@ -275,13 +761,13 @@ class ArffConv :
   #
   #-------------------------------------------------------------------------
 
-  def convArffTypes (self) :
+  def convArffTypes ( self, dataFrame = None ) :
 
     dfTypes = []
 
     for index in range ( 0, len (self.attributes) ) :
 
-      dataType = self.convArffType (index)
+      dataType = self.convArffType ( index, dataFrame )
 
       dfTypes.append (dataType)
 
@@ -300,6 +786,7 @@ class ArffConv :
   #   Example :
   #    float64    --> real
   #    int64      --> integer
+  #    category   --> {a,b,c}   categories in their order
   #    object     --> object    note format must be evaluated
   #    datetime64 --> date      note format must be evaluated
   #
@@ -313,7 +800,7 @@ class ArffConv :
 
     for idx in range ( 0, len (dtypes) ) :
 
-      datatype = dtypes [idx]
+      datatype = dtypes.iloc [idx]
       dfname   = datatype.name
 
       arffType = "string"   # default
@@ -332,15 +819,30 @@ class ArffConv :
         if dfname.startswith ("datetime" ) :
           arffType = "date"
           info ["ARFF dateformat"] = "dd-MM-yyyy HH:mm:ss"
+          info ["df dateformat"]   = "%d-%m-%Y %H:%M:%S"
+          break
+
+        if dfname.startswith ("timedelta" ) :
+          arffType = "date"
+          info ["ARFF dateformat"] = "HH:mm:ss"
+          info ["df dateformat"]   = "%H:%M:%S"
+          break
+
+        if dfname.startswith ("category") :
+          categories = pd.Series ( datatype.categories, dtype = object )
+          categories = self.formatColumn ( idx, categories ).tolist ()
+          arffType   = "{" + ",".join (categories) + "}"
           break
 
         if dfname.startswith ("object") :
-          colTypes = self.strMatrix.getColType (idx)
+          colTypes = self.getColTypes (idx)
 
           if ( len (colTypes) > 1 ) :     # string is default
+            colTypes = pd.Series ( colTypes, dtype = object )
+            colTypes = self.formatColumn ( idx, colTypes ).tolist ()
             arffType = ",".join (colTypes)
             arffType = "{" + arffType + "}"
-          else :
+          elif colTypes :
             arffType = colTypes  [0]
           break
 
@@ -355,65 +857,101 @@ class ArffConv :
 
   #-------------------------------------------------------------------------
   #
-  #  Member function :  convDateFormat  of  ArffConv
+  #  Member function :  getSampleIndex  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the sorted row positions of a stratified sample
+  #   for the type inference:  one third from the head, one third from the
+  #   tail and the rest randomly  (reproducible) from the middle.  It returns
+  #   None if no sample budget is set or the budget covers all rows.
+  #
+  #-------------------------------------------------------------------------
+
+  def getSampleIndex ( self, rows : int ) :
+
+    size = max ( self.sampleRows, int ( rows * self.sampleFraction ) )
+
+    if size <= 0 or size >= rows :
+      return None
+
+    part = size // 3
+
+    head   = np.arange ( 0, part )
+    tail   = np.arange ( rows - part, rows )
+    rng    = np.random.default_rng (0)
+    middle = rng.choice ( rows - 2 * part, size - 2 * part, replace = False )
+
+    return np.unique ( np.concatenate ( ( head, tail, middle + part ) ) )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  isSampleClear  of  ArffConv
   #
   #  Description :
   #
-  #   This function converts the arff date / time format to a format for a
-  #   pandas dataframe. This means any delimiters like ':', '-' or '/' are
-  #   converted to '%'.
+  #   This function checks if the types of a sample decide the type of the
+  #   column without a scan of all values (see getColTypes).
   #
   #-------------------------------------------------------------------------
 
-  def convDateFormat ( self, arffDate ) -> tuple :
+  def isSampleClear ( self, colTypes : list ) -> bool :
 
-    dateStr = arffDate.strip ()
-    dateStr = dateStr.replace ( '"', "" )
-    dateStr = dateStr.replace ( "\'", "" )
+    if colTypes in ( [ "string" ], [ "int" ], [ "float" ], [ "Time" ] ) :
+      return True
 
-    # convert time dateStr from Java's SimpleDateFormat to C's format
-    dateFormat = None
-    onlyTime   = True
+    numeric = { "int", "float", "Time" }.intersection (colTypes)
+
+    return bool (colTypes) and not numeric and \
+           ( len (colTypes) <= self.maxNominal // 2 )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getColTypes  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function evaluates the  distinct types of an object column (see
+  #   'StringUtils.getColumnTypes').  With a sample budget the type is
+  #   decided from the sample without a scan of the whole column if it is
+  #   clear :  more distinct types than 'maxNominal' (string), only "int",
+  #   only "float",  only "Time" or a nominal with at most half of
+  #   'maxNominal' categories.  Values outside the sample are then not
+  #   checked.  An ambiguous sample (e.g. "int" mixed with "float" or
+  #   categories) is verified against the whole column (see 'StringUtils.
+  #   matchColumnTypes'),  the column is classified completely only if a
+  #   value does not fit.
+  #
+  #-------------------------------------------------------------------------
 
-    if "yyyy" in dateStr :
-      dateStr = dateStr.replace ( "yyyy", "%Y" )
-      dateFormat = "Y"
-      onlyTime   = False
-    elif "yy" in dateStr :
-      dateStr = dateStr.replace ( "yy", "%y" )
-      dateFormat = "Y"
-      onlyTime   = False
+  def getColTypes ( self, index : int ) -> list :
 
-    if "MM" in dateStr :
-      dateStr = dateStr.replace ( "MM", "%m" )
-      dateFormat = "M"
-      onlyTime   = False
+    column = self.dataFrame.iloc [ :, index ].dropna ()
+    sample = self.getSampleIndex ( len (column) )
 
-    if "dd" in dateStr :
-      dateStr = dateStr.replace ( "dd", "%d" )
-      dateFormat = "D"
-      onlyTime   = False
+    if sample is not None :
+      colTypes = strUtils.getColumnTypes ( column.iloc [sample].astype (str),
+                                           self.maxNominal )
 
-    if "HH" in dateStr :
-      dateStr = dateStr.replace ( "HH", "%H" )
-      dateFormat = "h"
+      if self.isSampleClear (colTypes) :
+        return colTypes
 
-    if "mm" in dateStr :
-      dateStr = dateStr.replace ( "mm", "%M" )
-      dateFormat = "m"
+    try :
+      values = pd.Series ( pd.unique ( column.to_numpy () ), dtype = object )
+    except TypeError :     # unhashable values like lists
+      values = column
 
-    if "ss" in dateStr :
-      dateStr = dateStr.replace ( "ss", "%S" )
-      dateFormat = "s"
+    values = values.astype (str)
 
-    if "z" in dateStr or "Z" in dateStr :
-        raise ValueError ( "Date type attributes with time zone not "
-                           "supported, yet" )
+    if sample is not None :
+      colTypes = strUtils.matchColumnTypes ( values, colTypes )
 
-    if dateFormat is None:
-      raise ValueError ( "Invalid or unsupported date format" )
+      if colTypes is not None :
+        return colTypes
 
-    return dateStr, onlyTime
+    return strUtils.getColumnTypes ( values, self.maxNominal )
 
 
   #-------------------------------------------------------------------------
@@ -461,137 +999,68 @@ class ArffConv :
         line = re.sub ( r'\'.+?\'', "column - " + str (row), line )
         tmpList [row] = line
 
-    self.delimiter = strUtils.getDelimiter (tmpList)
+    try :
+      self.delimiter = strUtils.getDelimiter (tmpList)
+    except csv.Error :    # e.g. only sparse lines, use Arff delimiter
+      self.delimiter = ","
 
 
   #-------------------------------------------------------------------------
   #
-  #  Member function : parseData  of  ArffConv
+  #  Member function : splitRow  of  ArffConv
   #
   #  Description :
   #
-  #   This  function writes  the values  from the  string list  with comma
-  #   separated values into the matrix. This specific version also handles
-  #   sparse matrix and an optional weight  at the end.  Sparse matrix and
-  #   weights are surrounded by curly braces.
-  #
-  #   Example for a sparse matrix :
+  #   This  function splits  one line  of the  data section  into  a list
+  #   of values.  An optional weight at the  end of the line is  returned
+  #   separately (None if the line  has no weight).  A sparse line is ex-
+  #   panded to the given number of columns, not given values are "0".  If
+  #   'quoted' is set,  a dense line is split with 'splitValues',  quoted
+  #   values may then contain commas.
   #
-  #   @data
-  #   {1 X, 3 Y, 4 "class A"}
-  #   {2 W, 4 "class B"}
-  #
-  #   A weight can be associated with  an instance in a standard ARFF file
-  #   by  appending it  to  the end  of  the line  for  that instance  and
-  #   enclosing the value in urly braces.
-  #
-  #   Example for a weight at the end:
-  #
-  #   @data
-  #   0, X, 0, Y, "class A", {5}
-  #
-  #   For a sparse instance, this example would look like:
-  #
-  #   @data
-  #   {1 X, 3 Y, 4 "class A"}, {5}
-  #
-  #   Note that any instance without a weight value specified is assumed to
-  #   have a weight of 1 for backwards compatibility.
+  #   Example :
+  #    {1 X, 3 Y}, {5}   -->   [ "0", "X", "0", "Y" ], "5", True
   #
-  #-------------------------------------------------------------------------*/
+  #-------------------------------------------------------------------------
 
-  def parseData ( self, lines : list ) -> bool :
+  def splitRow ( self, line : str, cols : int, regex,
+                 quoted : bool = False ) -> tuple :
 
-    parts  : list
-    line   : str
-    value  : str
-    weight : bool
+    weight = None
 
-    weight = False
-    sparse = False
+    if line.endswith ( "}" ) :
+      result = regex.search (line)   # check for a weight at the line end
 
-    rows   = len (lines)
-    cols   = len ( self.attrNames )
+      if result :     # weight found, check for floating point value ?
+        # split manually preserve optional "{" of a sparse matrix
+        idx1, idx2 = result.span ()
 
-    if cols == 1 :
-      self.delimiter = "only one column"
+        value  = line [ idx1 + 1 : -1 ]
+        value  = value.strip ()
+        weight = value.replace ( "{", "" ).strip ()
+        line   = line [ 0:idx1 ]
 
-    self.strMatrix.setDelimiter (self.delimiter)
+    if not line.startswith ( "{" ) :   # no sparse matrix
+      if quoted :
+        return splitValues (line), weight, False
 
-    # compile regex for an optional weight at the end of a line
-    regex = re.compile ( ",\s*{.+?}$" )
+      return line.split ( "," ), weight, False
 
-    # first check for sparse matrix and weight
-    for row in range ( 0, rows ) :
-      line  = lines [row]
+    # sparse matrix in this line
+    line = line.replace ( "{", "" )
+    line = line.replace ( "}", "" )
 
-      result = regex.search (line)   # check for a weight at the line end
+    parts = [ "0" ] * cols
 
-      if result :
-        weight = True
-        break
+    for entry in line.split ( "," ) :
+      key : list = entry.strip ().split ( " ", 1 )
 
-    if weight :
-      cols = cols + 1           # additional column for the weight
+      if len (key) < 2 :     # empty sparse line
+        continue
 
-      self.attrNames.append ( "weight" )
-      info : dict = { "name" : "weight", "arffType" : "real" }
-      self.attributes.append (info)
+      parts [ int ( key [0] ) ] = key [1]
 
-    sMat = self.strMatrix       # reference to strMatrix
-
-    sMat.reset ( rows, cols )   # new size (shape or dimension)
-    sMat.fill ( "0" )   # new size (shape or dimension)
-
-    if weight :
-      parts = [ "1.0" ] * rows    # defaults
-      sMat.setColList ( parts, cols - 1 )
-
-    for row in range ( 0, rows ) :
-      line  = lines [row]
-
-      if weight :
-        result = regex.search (line)   # check for a weight at the line end
-
-        if result :     # weight found, check for floating point value ?
-          # split manually preserve optional "{" of a sparse matrix
-          idx1, idx2 = result.span ()
-
-          value = line [ idx1 + 1 : -1 ]
-          value = value.strip ()
-          value = value.replace ( "{", "" )
-          line  = line [ 0:idx1 ]
-
-          sMat.setValueText ( row, cols - 1, value.strip () )
-
-      if not line.startswith ( "{" ) :   # no sparse matrix
-        parts = line.split ( "," )
-
-        for col in range ( 0, len (parts) ) :
-          value = parts [col]
-          sMat.setValueText ( row, col, value )
-
-        continue
-
-      # sparse matrix in this line
-      line = line.replace ( "{", "" )
-      line = line.replace ( "}", "" )
-
-      sparse = True
-
-      rowLine : list = line.split ( "," )
-
-      for col in range ( 0, len (rowLine) ) :
-        entry = rowLine [col]
-        key : list = entry.split ( " " )
-        index = int ( key [0] )
-        value = key [1]
-
-        sMat.setValueText ( row, index, value )
-
-    changed = sparse or weight
-
-    return changed
+    return parts, weight, True
 
 
   #-------------------------------------------------------------------------
@@ -621,9 +1090,36 @@ class ArffConv :
 
   def parseHeader (self) :
 
-    for idx in range ( 0, len (self.header) ) :
+    relation, attributes = self.splitHeader (self.header)
+
+    if relation is not None :
+      self.relation = relation
+
+    for info in attributes :
+      self.attrNames.append ( info ["name"] )
+      self.attributes.append (info)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  splitHeader  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the relation ( None if there is none ) and the
+  #   list of attribute maps of the given header lines (see parseHeader).
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def splitHeader ( header : list ) -> tuple :
 
-      line = self.header [idx]
+    relation   = None
+    attributes = []
+
+    for idx in range ( 0, len (header) ) :
+
+      line = header [idx]
 
       if ( not line or line.startswith ( "%") ) :
         continue
@@ -633,7 +1129,7 @@ class ArffConv :
       if ok :
         text = line [ len ( "@Relation" ) + 1 : ]
         attr = text.strip ()
-        self.relation = attr
+        relation = attr
         continue
 
       ok = re.search ( "^@Attribute", line, re.IGNORECASE )
@@ -674,11 +1170,38 @@ class ArffConv :
       name  = name.strip ()
       value = value.strip ()
 
-      self.attrNames.append (name)
-
       info : dict = { "name" : name, "arffType" : value }
 
-      self.attributes.append (info)
+      attributes.append (info)
+
+    return relation, attributes
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readHeader  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads  the header lines from the given  line iterator
+  #   up to and including  the line with '@DATA' and parses  it.  The ite-
+  #   rator is then positioned at the first line of the data section.
+  #
+  #-------------------------------------------------------------------------
+
+  def readHeader ( self, lines ) -> bool :
+
+    self.header = []
+
+    for line in lines :
+
+      if re.search ( "^@Data", line, re.IGNORECASE ) :
+        self.parseHeader ()
+        return True
+
+      self.header.append (line)
+
+    return False
 
 
   #-------------------------------------------------------------------------
@@ -719,25 +1242,308 @@ class ArffConv :
 
           continue
 
-      # now check data section
-      if ( found and not line.startswith ( "%" ) ) :
+      # now check data section, skip comments and empty lines
+      if ( found and line and not line.startswith ( "%" ) ) :
         self.dataList.append (line)
 
     return True
 
 
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readFileHeader  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads the header of the ARFF file into a new instance,
+  #   so the data loaded into this instance is kept (e.g. while iterating
+  #   with iterRows).  It returns the new instance and the line iterator
+  #   positioned on the first data line,  or (None, None) if the file has
+  #   no data section.
+  #
+  #-------------------------------------------------------------------------
+
+  def readFileHeader (self) -> tuple :
+
+    header = ArffConv ()
+    header.setFileName (self.fileName)
+
+    lines = header.fileUtils.iterLines ()
+
+    if not header.readHeader (lines) :
+      lines.close ()
+      return None, None
+
+    return header, lines
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  iterRows  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function  is a generator which  reads the header  of the  ARFF
+  #   file and then  yields the parsed data  rows one by one as string
+  #   lists.  The file is read lazily, only the current line is in memory.
+  #   Sparse rows are expanded.  If 'withWeight' is set, the  weight of the
+  #   instance (default 1.0) is appended as an additional value.  The data
+  #   already loaded into this instance is not changed (see readFileHeader).
+  #
+  #   Example :
+  #    for row in arff.iterRows () :
+  #      print (row)     # [ "sunny", "85.0", "85.0", "FALSE", "no" ]
+  #
+  #-------------------------------------------------------------------------
+
+  def iterRows ( self, withWeight : bool = False ) :
+
+    header, lines = self.readFileHeader ()
+
+    if header is None :
+      return
+
+    cols  = len (header.attrNames)
+    regex = re.compile ( r",\s*{.+?}$" )
+
+    for line in lines :
+
+      if ( not line or line.startswith ( "%" ) ) :
+        continue
+
+      parts, weight, sparse = self.splitRow ( line, cols, regex, True )
+
+      row = [ cleanValue (value) for value in parts ]
+
+      if withWeight :
+        row.append ( weight if weight is not None else "1.0" )
+
+      yield row
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  iterDataFrames  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function is a generator which reads the ARFF file in chunks and
+  #   yields a pandas data frame  with at most 'chunksize' rows per chunk.
+  #   The data types of the columns  are taken from the header, therefore
+  #   every chunk has the same  schema (see getChunkTypes).  The index of
+  #   the chunks continues over all chunks like the index of the complete
+  #   data frame.  The data already loaded into this instance is kept.
+  #
+  #   Example :
+  #    for df in arff.iterDataFrames ( chunksize = 10000 ) :
+  #      print ( df.shape )
+  #
+  #-------------------------------------------------------------------------
+
+  def iterDataFrames ( self, chunksize : int = 10000,
+                       withWeight : bool = False ) :
+
+    if chunksize < 1 :
+      raise ValueError ( "chunksize must be a positive integer" )
+
+    header, lines = self.readFileHeader ()   # keeps the loaded data
+
+    if header is None :
+      return
+
+    parser = ArffParser (header.attributes)
+    parser.blockSize = chunksize
+
+    dtypes = header.getChunkTypes ()
+    start  = 0
+
+    for line in lines :
+
+      parser.parseLine (line)
+
+      if parser.nRows () >= chunksize :
+        dataFrame = header.buildChunk ( parser, start, withWeight, dtypes )
+        start     = start + len (dataFrame)
+
+        yield dataFrame
+
+    if parser.nRows () > 0 :
+      yield header.buildChunk ( parser, start, withWeight, dtypes )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getChunkTypes  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the data types of the numeric and nominal
+  #   columns for 'iterDataFrames'.  They are derived once from the header,
+  #   so they do not depend on the values of a chunk :
+  #
+  #    REAL, NUMERIC --> float64
+  #    INTEGER       --> Int64     ( nullable, missing values are <NA> )
+  #    {yes,no}      --> category  ( only the declared values )
+  #
+  #   Date and string columns have a fixed type anyway (see convArffType).
+  #
+  #   The numeric types differ from 'loadArff' on purpose :  loadArff sees
+  #   all values and gives int64 for NUMERIC and INTEGER columns with only
+  #   integral values and  float64 otherwise (with downcast smaller types,
+  #   see ArffParser.getNumType).  A chunk cannot know the values of the
+  #   following chunks, NUMERIC may hold reals and INTEGER missing values.
+  #
+  #-------------------------------------------------------------------------
+
+  def getChunkTypes (self) -> dict :
+
+    dtypes = {}
+
+    for info in self.attributes :
+      arffType = info ["arffType"].lower ()
+
+      if arffType in ( "real", "numeric" ) :
+        dtype = "float64"
+      elif arffType == "integer" :
+        dtype = "Int64"
+      elif arffType.startswith ( "{" ) :
+        categories = dict.fromkeys ( getCategories ( info ["arffType"] ) )
+        dtype = pd.CategoricalDtype ( list (categories) )
+      else :
+        continue
+
+      dtypes [ info ["name"] ] = dtype
+
+    return dtypes
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  buildChunk  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function takes  the rows parsed so far from  the given parser
+  #   and returns them as  pandas data frame with the data  types of the
+  #   attributes. The index starts with the given row number.  The given
+  #   types (see getChunkTypes) replace the types derived from the values.
+  #
+  #-------------------------------------------------------------------------
+
+  def buildChunk ( self, parser : ArffParser, start : int,
+                   withWeight : bool = False, dtypes : dict = None ) :
+
+    dataFrame = parser.getDataFrame ( start, withWeight )
+
+    parser.reset ()
+
+    self.convArffTypes (dataFrame)
+
+    if dtypes :
+      dataFrame = dataFrame.astype (dtypes)
+
+      for info in self.attributes :
+        if info ["name"] in dtypes :
+          info ["dataType"] = str ( dtypes [ info ["name"] ] )
+
+    return dataFrame
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getIndex  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the  byte offset index  of the ARFF file (see
+  #   ArffIndex).  The index is loaded  from the sidecar file  if it is up
+  #   to date, otherwise it is built and stored as sidecar file.
+  #
+  #-------------------------------------------------------------------------
+
+  def getIndex ( self, step : int = 1000 ) -> ArffIndex :
+
+    index = self.rowIndex
+
+    if ( index is not None ) and ( index.fileName == self.fileName ) and \
+       index.isCurrent () :
+      return index
+
+    index = ArffIndex ( self.fileName, step )
+
+    if not index.load () :
+      if not index.build () :
+        return None
+
+      index.save ()     # not possible e.g. in a read-only directory
+
+    header = ArffConv ()
+    header.setFileName (self.fileName)
+
+    lines = header.fileUtils.iterLines ()
+    header.readHeader (lines)
+    lines.close ()
+
+    self.rowIndex  = index
+    self.rowHeader = header
+
+    return index
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readRows  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads  the rows start to stop - 1 (like a slice) of the
+  #   ARFF file  and returns them  as pandas data frame with  the data types
+  #   of the attributes.  The rows are  read directly through the byte off-
+  #   set index (see getIndex) without scanning the file from the top.
+  #
+  #   Example :
+  #    df = arff.readRows ( 1000, 1100 )    # 100 rows, index 1000 - 1099
+  #
+  #-------------------------------------------------------------------------
+
+  def readRows ( self, start : int, stop : int,
+                 withWeight : bool = False ) :
+
+    index = self.getIndex ()
+
+    if index is None :
+      return None
+
+    header = self.rowHeader
+
+    if not self.attributes :    # header of the file not yet known
+      self.relation   = header.relation
+      self.attributes = header.attributes
+      self.attrNames  = header.attrNames
+
+    lines = index.readLines ( start, stop )
+
+    parser = ArffParser (header.attributes)
+    parser.parseLines (lines)
+
+    return header.buildChunk ( parser, max ( start, 0 ), withWeight )
+
+
   #-------------------------------------------------------------------------
   #
   #  Member function :  getDataFrame  of  ArffConv
   #
   #  Description :
   #
-  #   This function returns the data frame, a pandas dataframe.
+  #   This function returns the data frame, a pandas dataframe.  After a
+  #   lazy load the data is read first.
   #
   #-------------------------------------------------------------------------
 
   def getDataFrame (self) -> list :
 
+    self.ensureData ()
+
     return self.dataFrame
 
 
@@ -747,29 +1553,16 @@ class ArffConv :
   #
   #  Description :
   #
-  #   This function converts the data frame  to the string matrix and also
-  #   to a list representation in dataList. It is necessary to do it after
-  #   an  arff file  is loaded  but also  before it  saved if  any of  the
-  #   attributes was changed.
+  #   This function converts the data frame  to a list representation in
+  #   dataList.  The columns are converted at  once with the ARFF format of
+  #   the attributes (see formatColumn),  therefore the attributes must
+  #   already exist.
   #
   #-------------------------------------------------------------------------
 
   def convDataFrame (self) :
 
-    rows = self.strMatrix.nRows ()
-    cols = self.strMatrix.nCols ()
-
-    for idx in range ( 0, rows ) :
-      dataRow = list ( self.dataFrame.loc [idx] )
-
-      # make sure we have the string representation
-      for col in range ( 0, cols ) :
-        value = str ( dataRow [col] )
-        dataRow [col] = value
-
-      self.strMatrix.setRowList ( dataRow, idx )
-
-    self.dataList = self.strMatrix.toText ()
+    self.dataList = self.getDataText ()
 
 
   #-------------------------------------------------------------------------
@@ -790,29 +1583,29 @@ class ArffConv :
   #    datetime  --> datetime64 [ns]
   #    string    --> object
   #
+  #   The types of object columns are inferred from a sample if 'sampleRows'
+  #   or 'sampleFraction' is given (see getColTypes).
+  #
   #-------------------------------------------------------------------------
 
-  def setDataFrame ( self, dataFrame ) :
+  def setDataFrame ( self, dataFrame, sampleRows : int = 0,
+                     sampleFraction : float = 0.0 ) :
+
+    self.sampleRows     = sampleRows
+    self.sampleFraction = sampleFraction
+    self.pendingLoad    = None
 
     self.dataFrame  = dataFrame
     self.attrNames  = dataFrame.columns.values.tolist ()
     self.attributes = []
 
-    rows, cols = dataFrame.shape
-
-    self.strMatrix.reset ( rows, cols )
-
-    self.convDataFrame ()
-
-    # dataframe and strMatrix must already exist
     self.convDataType ()
 
-    self.strMatrix.setColLabels (self.attrNames)
-    self.strMatrix.setDelimiter (self.delimiter)
-    self.strMatrix.setCleanQuotes (True)
-    self.dataList = self.strMatrix.toText ()
+    # attributes must already exist for the format of the values
+    self.convDataFrame ()
 
-    self.attrChanged = False
+    self.dataChanged = False
+    self.isValid     = True
 
 
   #-------------------------------------------------------------------------
@@ -883,12 +1676,15 @@ class ArffConv :
   #
   #  Description :
   #
-  #   This function sets attribute type for the given name.
+  #   This function sets attribute type for the given name.  The data list
+  #   is built again from the data frame with the new type (see getData).
   #
   #-------------------------------------------------------------------------
 
   def setAttributeType ( self, attrName : str, attrType : str ) :
 
+    self.ensureData ()
+
     idx = self.attrNames.index (attrName)
 
     if ( idx < 0 ) :
@@ -897,24 +1693,13 @@ class ArffConv :
     info = self.attributes [idx]
     info ["arffType"] = attrType
 
-    self.attrChanged = True
+    self.dataChanged = False
+    self.dataList    = []     # text with the old type
 
     text = attrType.lower ()
 
-    if not text.startswith ( "date" ) :
-      return
-
-    self.convArffType (idx)
-
-    df = self.dataFrame   # reference to dataframe
-
-    datacol  = df [attrName]  # get specific column by name
-    dformat  = info ["df dateformat"]    # format of python datetype
-
-    # convert column
-    textList = datacol.dt.strftime (dformat)
-
-    self.strMatrix.setColList ( textList, idx )
+    if text.startswith ( "date" ) :
+      self.convArffType (idx)
 
 
   #-------------------------------------------------------------------------
@@ -924,12 +1709,22 @@ class ArffConv :
   #  Description :
   #
   #   This function  returns the  data list,  this is  a string  list very
-  #   every string contains the values with a delimiter like a comma.
+  #   every string contains the values with a delimiter like a comma.  If
+  #   the data was taken from the cache  or  only some columns were loaded,
+  #   the list is built from the csr matrix or the data frame first.
   #
   #-------------------------------------------------------------------------
 
   def getData (self) -> list :
 
+    self.ensureData ()
+
+    if ( not self.dataList ) and ( self.sparseMat is not None ) :
+      self.dataList = self.getDataTextCsr ( 0, self.sparseMat.shape [0] )
+
+    elif ( not self.dataList ) and ( self.dataFrame is not None ) :
+      self.dataList = self.getDataText ()
+
     return self.dataList
 
 
@@ -941,13 +1736,16 @@ class ArffConv :
   #
   #   This function takes  the given list and assigns it to the data list,
   #   this is a  string list very every string contains  the values with a
-  #   separator like a comma.
+  #   separator like a comma.  'saveArff' then writes this list instead of
+  #   the data frame or the csr matrix.
   #
   #-------------------------------------------------------------------------
 
   def setData ( self, datArray : list ) :
 
-    self.dataList = datArray
+    self.dataList    = datArray
+    self.dataChanged = True
+    self.pendingLoad = None     # the data of a lazy load is replaced
 
 
   #-------------------------------------------------------------------------
@@ -982,114 +1780,845 @@ class ArffConv :
 
   #-------------------------------------------------------------------------
   #
-  #  Member function :  loadArff  of  ArffConv
+  #  Member function :  setCacheDir  of  ArffConv
   #
   #  Description :
   #
-  #   This function  loads a  file in  ARFF format  and stores  the values
-  #   (string) in the 'data' matrix (dataframe)
+  #   This function enables the binary parse cache in the given directory
+  #   (see ArffCache).  'loadArff' then takes unchanged files from the cache
+  #   instead of parsing them.  An empty directory name disables the cache.
+  #
+  #  Input parameter  :
+  #   cacheDir        : directory of the cache
+  #   maxSize         : maximum size of the cache in bytes
+  #   useHash         : check also the content hash of the files
   #
   #-------------------------------------------------------------------------
 
-  def loadArff (self) :
+  def setCacheDir ( self, cacheDir : str, maxSize : int = 2**30,
+                    useHash : bool = False ) :
 
-    self.init ()
+    self.cache = None
 
-    ok = self.readFile ()
+    if cacheDir :
+      self.cache = ArffCache ( cacheDir, maxSize, useHash )
 
-    if not ok :
-      return ok
 
-    self.parseHeader   ()
-    self.evalDelimiter ()
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getColumnIndex  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function resolves the names of the attributes to load ( member
+  #   'columns', see loadArff ) against the attribute names of the header.
+  #   The indexes are returned in the order of the header, None if all
+  #   attributes are loaded.
+  #
+  #-------------------------------------------------------------------------
 
-    if self.delimiter != "," :      # could be confused with date variables
-      msg = "Found wrong delimiter in arff file : " + self.fileName
-      print (msg)
-      self.delimiter = ","
+  def getColumnIndex (self) -> list :
 
-    self.buildData ()
+    if self.columns is None :
+      return None
 
-    self.isValid = ok
+    if isinstance ( self.columns, str ) :
+      names = [ self.columns ]
+    else :
+      names = list (self.columns)
 
-    return ok
+    position = { name : idx for idx, name in enumerate (self.attrNames) }
+
+    for name in names :
+      if name not in position :
+        raise ValueError ( "Unknown attribute : " + str (name) )
+
+    return sorted ( { position [name] for name in names } )
 
 
   #-------------------------------------------------------------------------
   #
-  #  Member function :  saveArff  of  ArffConv
+  #  Member function :  selectColumns  of  ArffConv
   #
   #  Description :
   #
-  #   This function  saves data and header in  ARFF format in a file
-  #   with the defined filename.
+  #   This function keeps only the attributes with the given indexes (see
+  #   getColumnIndex), None keeps all attributes.
   #
   #-------------------------------------------------------------------------
 
-  def saveArff ( self, fileName : str = "" ) -> bool :
+  def selectColumns ( self, index : list ) :
 
-    if ( self.isValid == False ) :
-      return False
+    if index is None :
+      return
 
-    if not fileName :
-      fileName = self.fileName
+    self.attributes = [ self.attributes [idx] for idx in index ]
+    self.attrNames  = [ self.attrNames [idx] for idx in index ]
 
-    if self.attrChanged :
-      self.dataList = self.strMatrix.toText ()
 
-    content = []
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  loadHeader  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads only the header of  the ARFF file and records the
+  #   options of the load.  Relation and attributes are then available, the
+  #   data is read later by 'ensureData'.
+  #
+  #-------------------------------------------------------------------------
 
-    text = "@RELATION " + self.relation + "\n"  # plus empty line
-    content.append (text)
+  def loadHeader ( self, workers : int = 1, engine : str = "python" ) -> bool :
 
-    for index in range ( 0, len (self.attributes) ) :
+    lines = self.fileUtils.iterLines ()
+    found = self.readHeader (lines)
+    lines.close ()
 
-      info = self.attributes [index]
+    if not found :
+      return False
 
-      value = info ["arffType"]
-      name  = info ["name"]
+    self.selectColumns ( self.getColumnIndex () )
 
-      if value == "date" :
-        text = ' "' + info ["ARFF dateformat"] + '"'
-        value = value + text
+    self.pendingLoad = { "workers"  : workers,
+                         "downcast" : self.downcast,
+                         "engine"   : engine,
+                         "columns"  : self.columns,
+                         "where"    : self.where }
 
-      text  = "@ATTRIBUTE " + name + " " + value
-      content.append (text)
+    self.isValid = True
 
-    text = "\n@DATA"
-    content.append (text)
+    return True
 
-    content.extend ( self.dataList )
 
-    self.fileUtils.setFileName (fileName)
-    self.fileUtils.writeFile (content)
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  probe  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function returns the schema and the size of an ARFF file without
+  #   loading the data.  The file is mapped into memory, only the header
+  #   is decoded and parsed.  No matrix and no data frame is built.  A
+  #   compressed file is read sequentially, the rows are always counted.
+  #
+  #   The map contains :
+  #    relation        : relation of the header
+  #    attributes      : list of attribute maps ( name and arffType )
+  #    sparse          : the first data lines are sparse ( {1 X, 3 Y} )
+  #    weighted        : the first data lines have a weight ( , {5} )
+  #    dataOffset      : byte offset of the first line after @DATA
+  #    rows            : number of data lines (comments and empty lines
+  #                      are skipped), estimated if 'exact' is false
+  #    exact           : the row count is exact
+  #
+  #  Input parameter  :
+  #   fileName        : name of the ARFF file
+  #   exact           : count the rows exactly or estimate them from the
+  #                     line lengths of samples (see ArffIndex.estimateRows)
+  #   sampleLines     : number of data lines checked for the flags
+  #
+  #  Output parameter :
+  #   (dict)          : the map above or None if the file cannot be read
+  #                     or has no @DATA line
+  #
+  #-------------------------------------------------------------------------
 
-    return True
+  @staticmethod
+  def probe ( fileName : str, exact : bool = True,
+              sampleLines : int = 1000 ) -> dict :
+
+    try :
+      with FileUtils.openFile ( fileName, "rb" ) as hfile :
+        if FileUtils.getCompression (fileName) is not None :
+          exact  = True      # no size of the data section, count the rows
+          result = ArffConv.probeData ( hfile, exact, sampleLines )
+
+        elif os.fstat ( hfile.fileno () ).st_size == 0 :
+          return None
+
+        else :
+          with mmap.mmap ( hfile.fileno (), 0, access = mmap.ACCESS_READ ) \
+               as mm :
+            result = ArffConv.probeData ( mm, exact, sampleLines )
+
+    except READ_ERRORS :
+      msg = "Cannot open file : " + fileName + " for reading !"
+      print (msg)
+
+      return None
+
+    if result is None :
+      return None
+
+    header, sparse, weighted, offset, rows = result
+
+    relation, attributes = ArffConv.splitHeader (header)
+
+    return { "relation"   : relation if relation is not None else "",
+             "attributes" : attributes,
+             "sparse"     : sparse,
+             "weighted"   : weighted,
+             "dataOffset" : offset,
+             "rows"       : rows,
+             "exact"      : exact }
 
 
   #-------------------------------------------------------------------------
   #
-  #  Member function :  saveDataFrame  of  ArffConv
+  #  Member function :  probeData  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function evaluates the content of an ARFF file for 'probe'. The
+  #   content is a mmap  or a binary  stream  (compressed file), a stream
+  #   is read sequentially and its rows are always counted.
+  #
+  #  Output parameter :
+  #   (tuple)         : header lines, sparse, weighted, offset of the data
+  #                     section and number of rows or None without @DATA
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def probeData ( data, exact : bool, sampleLines : int ) -> tuple :
+
+    offset = ArffIndex.findDataOffset (data)
+
+    if offset < 0 :
+      return None
+
+    data.seek (0)
+    header = data.read (offset).decode ( "utf8" ).splitlines ()
+
+    sparse   = False
+    weighted = False
+
+    regex = re.compile ( rb",\s*{.+?}$" )   # weight at the line end
+
+    count = 0
+
+    while count < sampleLines :
+      line = data.readline ()
+
+      if not line :
+        break
+
+      if not ArffIndex.isDataLine (line) :
+        continue
+
+      line     = line.strip ()
+      sparse   = sparse or line.startswith ( b"{" )
+      weighted = weighted or ( regex.search (line) is not None )
+      count    = count + 1
+
+    if exact :
+      rows = ArffIndex.countRows ( data, offset )
+    else :
+      rows = ArffIndex.estimateRows ( data, offset )
+
+    return header, sparse, weighted, offset, rows
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  ensureData  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function reads the data of a lazy load (see loadArff) if it is
+  #   not yet done.  The data is read only once by a complete 'loadArff' with
+  #   the recorded options,  the header is therefore read again.  Only a
+  #   changed description is kept,  attributes must be changed after the
+  #   data is read (setAttributeType reads it first).
+  #
+  #  Output parameter :
+  #   success         : Success, true or false
+  #
+  #-------------------------------------------------------------------------
+
+  def ensureData (self) -> bool :
+
+    if self.pendingLoad is None :
+      return True
+
+    options  = self.pendingLoad
+    relation = self.relation
+
+    ok = self.loadArff ( **options )
+
+    self.relation = relation
+
+    return ok
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  loadArff  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function  loads a  file in  ARFF format  and stores  the values
+  #   (string) in the 'data' matrix (dataframe)
+  #
+  #   With 'sparse' the data is loaded  directly into a scipy  csr matrix
+  #   (see getSparseMatrix) without building a dense matrix :
+  #    False           : dense loading (default)
+  #    True, "frame"   : csr matrix and data frame with sparse columns
+  #    "csr"           : only the csr matrix, no data frame
+  #
+  #   With 'workers' > 1 the  data section of a dense  load is parsed by
+  #   several processes (see buildParallel).
+  #
+  #   With 'downcast' numeric columns get smaller types (see ArffParser) :
+  #    False           : float64 and int64 (default)
+  #    True            : float32 and the smallest integer type
+  #    "float"         : only float32
+  #    "integer"       : only the smallest integer type
+  #
+  #   With 'engine' the data section of a dense load is read by :
+  #    "python"        : the parser of this module (default)
+  #    "c", "pyarrow"  : the csv reader of pandas (see buildCsv), sparse or
+  #                      weighted files are read by the parser
+  #
+  #   Compressed files ( gzip, bz2, xz ) are always read sequentially by the
+  #   parser, 'engine' and 'workers' are then ignored.
+  #
+  #   With 'lazy' a dense load reads only the header (see loadHeader), the
+  #   data is read on the first access (see ensureData).
+  #
+  #   With 'columns' ( list of attribute names ) only these attributes are
+  #   loaded, in the order of the header.  The values of the other attri-
+  #   butes are dropped while the lines are split.
+  #
+  #   With 'where' only the rows which match the filter are loaded, it is
+  #   evaluated for every block of parsed lines (see ArffParser.evalWhere) :
+  #    ( "class", "==", "Iris-setosa" )      a condition
+  #    [ ( "a", ">", 1 ), ( "b", "<", 5 ) ]   all conditions must be true
+  #    lambda df : df ["a"] > df ["b"]        a boolean mask of a data frame
+  #   A filtered load is always parsed by the own parser (any engine), a
+  #   callable must be picklable for workers > 1.  Sparse loading does not
+  #   support a filter.
+  #
+  #-------------------------------------------------------------------------
+
+  def loadArff ( self, sparse = False, workers : int = 1, downcast = False,
+                 engine : str = "python", lazy : bool = False,
+                 columns : list = None, where = None ) :
+
+    self.init ()
+
+    self.downcast = downcast
+    self.columns  = columns
+    self.where    = where
+
+    if where is not None :
+      getConditions (where)     # check the filter before reading
+
+    if ( self.cache is not None ) and not sparse :
+      entry = self.cache.load ( self.fileName, { "downcast" : downcast } )
+
+      if entry is not None :
+        self.relation, self.attributes, self.dataFrame = entry
+        self.attrNames = [ info ["name"] for info in self.attributes ]
+        self.isValid   = True
+
+        index = self.getColumnIndex ()
+
+        if where is not None :
+          mask = evalWhere ( where, self.dataFrame )
+          self.dataFrame = self.dataFrame [mask].reset_index ( drop = True )
+
+        if index is not None :
+          self.selectColumns (index)
+          self.dataFrame = self.dataFrame [ self.attrNames ]
+
+        self.convArffTypes ()     # the entry may have other numeric types
+
+        return True
+
+    if engine not in ( "python", "c", "pyarrow" ) :
+      raise ValueError ( "Unsupported engine : " + str (engine) )
+
+    if lazy and not sparse :
+      return self.loadHeader ( workers, engine )
+
+    useCsv = False
+
+    # byte offsets of compressed files are not known, read them sequentially
+    plain = FileUtils.getCompression (self.fileName) is None
+
+    if ( engine != "python" ) and ( where is None ) and plain and \
+       not sparse :
+      useCsv = self.buildCsv (engine)
+
+      if not useCsv :     # the header is read again by the parser
+        self.init ()
+
+    if useCsv :
+      ok = True
+
+    elif ( workers > 1 ) and plain and not sparse :
+      ok = self.buildParallel (workers)
+
+      if not ok :
+        return ok
+
+    else :
+      ok = self.readFile ()
+
+      if not ok :
+        return ok
+
+      self.parseHeader   ()
+      self.evalDelimiter ()
+
+      if self.delimiter != "," :      # could be confused with date variables
+        msg = "Found wrong delimiter in arff file : " + self.fileName
+        print (msg)
+        self.delimiter = ","
+
+      if sparse :
+        self.buildSparse ( sparse != "csr" )
+      else :
+        self.buildData ()
+
+    if ( self.cache is not None ) and ( self.dataFrame is not None ) and \
+       ( columns is None ) and ( where is None ) and not sparse :
+      self.cache.store ( self.fileName, self.relation, self.attributes,
+                         self.dataFrame, { "downcast" : downcast } )
+
+    self.isValid = ok
+
+    return ok
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  saveArff  of  ArffConv
   #
   #  Description :
   #
   #   This function  saves data and header in  ARFF format in a file
   #   with the defined filename.
   #
+  #   With 'sparse' the data lines are written in the sparse format :
+  #    False           : dense lines (default)
+  #    True            : sparse lines, only values not zero
+  #    "auto"          : sparse lines if the density (part of values not
+  #                      zero) is below 'sparseThreshold'
+  #
+  #   A file name with the extension .gz, .bz2 or .xz is written compressed
+  #   with the given 'compressLevel' (see FileUtils.openFile).  A data list
+  #   set by 'setData' is written as it is, always with dense lines.
+  #
+  #-------------------------------------------------------------------------
+
+  def saveArff ( self, fileName : str = "", sparse = False,
+                 compressLevel : int = None ) -> bool :
+
+    if ( self.isValid == False ) or not self.ensureData () :
+      return False
+
+    if not fileName :
+      fileName = self.fileName
+
+    if sparse == "auto" :
+      sparse = self.getDensity () < self.sparseThreshold
+
+    if sparse and ( self.dataFrame is None ) and ( self.sparseMat is None ) :
+      sparse = False
+
+    if self.dataChanged :
+      dataList = self.dataList
+
+    elif sparse :
+      dataList = self.getSparseText ()
+
+    elif self.sparseMat is not None :
+      dataList = self.iterDataTextCsr ()  # nominal codes back to values
+
+    elif self.dataFrame is not None :
+      dataList = self.iterDataText ()     # streamed in chunks
+
+    else :
+      dataList = self.getData ()
+
+    content = []
+
+    text = "@RELATION " + self.relation + "\n"  # plus empty line
+    content.append (text)
+
+    for index in range ( 0, len (self.attributes) ) :
+
+      info = self.attributes [index]
+
+      value = info ["arffType"]
+      name  = info ["name"]
+
+      if value == "date" :
+        text = ' "' + info ["ARFF dateformat"] + '"'
+        value = value + text
+
+      text  = "@ATTRIBUTE " + name + " " + value
+      content.append (text)
+
+    text = "\n@DATA"
+    content.append (text)
+
+    fileUtils = FileUtils ()
+    fileUtils.setFileName (fileName)
+
+    return fileUtils.writeFile ( itertools.chain ( content, dataList ),
+                                 compressLevel = compressLevel )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  formatColumn  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function converts the given data frame column of the attribute
+  #   with the  given index into  ARFF values and  returns them as  pandas
+  #   series of strings.  Dates are formatted with the date format of the
+  #   attribute, missing values are written as '?'.  Strings with spaces,
+  #   commas, quotes or braces are quoted with single quotes.  Of categori-
+  #   cals only the categories are formatted.  The returned series has a
+  #   range index, the index of the column may contain duplicates.
+  #
+  #-------------------------------------------------------------------------
+
+  def formatColumn ( self, index : int, column ) :
+
+    column  = column.reset_index ( drop = True )
+    info    = self.attributes [index] if index < len (self.attributes) \
+              else {}
+    missing = column.isna ()
+    kind    = column.dtype.kind
+
+    if isinstance ( column.dtype, pd.CategoricalDtype ) :
+      # format only the categories, the code -1 takes the last entry "?"
+      names = pd.Series ( column.cat.categories, dtype = object )
+      names = self.formatColumn ( index, names ).to_numpy ( dtype = object )
+      names = np.append ( names, "?" )
+
+      return pd.Series ( names [ column.cat.codes.to_numpy () ],
+                         index = column.index )
+
+    if kind in "fiub" :
+      text = column.astype (str)
+
+    else :
+      if kind in "mM" :
+        dformat = info.get ( "df dateformat", "%Y-%m-%dT%H:%M:%S" )
+        text    = formatDates ( column, dformat ).fillna ( "" )
+      else :
+        text = column.astype (str)
+
+      quote = text.str.contains ( r"[\s,'\"%{}]", regex = True ) | \
+              ( text == "" )
+
+      if quote.any () :
+        quoted = "'" + text [quote].str.replace ( "\\", "\\\\",
+                                                  regex = False ) \
+                                     .str.replace ( "'", "\\'",
+                                                    regex = False ) + "'"
+        text = text.mask ( quote, quoted )
+
+    if missing.any () :
+      text = text.mask ( missing, "?" )
+
+    return text
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getDataText  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function converts  the data frame column  by column into ARFF
+  #   values and returns the data lines as string list.  Default is the
+  #   data frame of this class.
+  #
+  #-------------------------------------------------------------------------
+
+  def getDataText ( self, dataFrame = None ) -> list :
+
+    df = self.dataFrame if dataFrame is None else dataFrame
+
+    if ( df is None ) or ( len (df.columns) == 0 ) :
+      return []
+
+    text = None
+
+    for index in range ( 0, len (df.columns) ) :
+      column = self.formatColumn ( index, df.iloc [ :, index ] )
+
+      text = column if text is None else text + "," + column
+
+    return text.tolist ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  iterDataText  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function is a generator which converts the data frame in chunks
+  #   of rows (see getDataText) and yields every chunk as one text block.
+  #   The lines of a block are separated by  newlines, the last line has
+  #   no newline.  Only one chunk is kept as text in memory.
+  #
+  #-------------------------------------------------------------------------
+
+  def iterDataText ( self, chunksize : int = 65536 ) :
+
+    df = self.dataFrame
+
+    for start in range ( 0, len (df), chunksize ) :
+      lines = self.getDataText ( df.iloc [ start : start + chunksize ] )
+
+      if lines :
+        yield "\n".join (lines)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getDataTextCsr  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function converts the rows start to stop - 1 of the csr matrix
+  #   (sparse loading) into dense ARFF lines.  Codes of nominal attributes
+  #   are converted back to their values, integral numbers are written
+  #   without decimals and weights not equal to 1 are appended ( , {w} ).
+  #
+  #-------------------------------------------------------------------------
+
+  def getDataTextCsr ( self, start : int, stop : int ) -> list :
+
+    values  = self.sparseMat [ start : stop ].toarray ()
+    columns = {}
+
+    for col in range ( 0, len (self.attributes) ) :
+      info   = self.attributes [col]
+      column = values [ :, col ]
+
+      if getAttrKind ( info ["arffType"] ) == "nominal" :
+        categories = info.get ( "categories" ) or \
+                     getCategories ( info ["arffType"] )
+        codes      = np.where ( np.isnan (column), -1, column )
+
+        column = pd.Categorical.from_codes ( codes.astype (np.int64),
+                                             categories )
+
+      elif np.isfinite (column).all () and \
+           ( column == np.trunc (column) ).all () :
+        column = column.astype (np.int64)
+
+      columns [ self.attrNames [col] ] = column
+
+    lines = self.getDataText ( pd.DataFrame (columns) )
+
+    if self.weights is not None :
+      for row in range ( 0, len (lines) ) :
+        weight = self.weights [ start + row ]
+
+        if weight != 1.0 :
+          lines [row] = lines [row] + ", {" + str (weight) + "}"
+
+    return lines
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  iterDataTextCsr  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function is a generator which yields the dense ARFF lines of
+  #   the csr matrix in chunks of rows (see getDataTextCsr, iterDataText).
+  #
+  #-------------------------------------------------------------------------
+
+  def iterDataTextCsr ( self, chunksize : int = 65536 ) :
+
+    rows = self.sparseMat.shape [0]
+
+    for start in range ( 0, rows, chunksize ) :
+      lines = self.getDataTextCsr ( start, start + chunksize )
+
+      if lines :
+        yield "\n".join (lines)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getDensity  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This  function returns  the part  of values  which are  not zero. Only
+  #   numeric values can be zero,  values of other attributes are counted
+  #   as not zero.  For data loaded in  sparse mode the density of the csr
+  #   matrix is returned.
+  #
+  #-------------------------------------------------------------------------
+
+  def getDensity (self) -> float :
+
+    self.ensureData ()
+
+    if self.sparseMat is not None :
+      rows, cols = self.sparseMat.shape
+      total = rows * cols
+
+      return self.sparseMat.nnz / total if total else 1.0
+
+    df = self.dataFrame
+
+    if ( df is None ) or ( df.size == 0 ) :
+      return 1.0
+
+    numeric = df.select_dtypes ( include = "number" )
+    zeros   = int ( ( numeric == 0 ).to_numpy ().sum () )
+
+    return 1.0 - zeros / df.size
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getSparseText  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This  function converts the data  into lines in the  sparse ARFF for-
+  #   mat. Only values  which are not zero are written with  their index.
+  #   The values are computed  column-wise from the csr matrix (sparse lo-
+  #   ading) or from the data frame.
+  #
+  #   Example :
+  #    0,X,0,Y,"class A"   -->   {1 X,3 Y,4 'class A'}
+  #
+  #-------------------------------------------------------------------------
+
+  def getSparseText (self) -> list :
+
+    if self.sparseMat is not None :
+      return self.getSparseTextCsr ()
+
+    df = self.dataFrame
+
+    entries = []
+
+    for index in range ( 0, len (self.attrNames) ) :
+      column = df [ self.attrNames [index] ]
+
+      text = str (index) + " " + self.formatColumn ( index, column )
+      kind = getAttrKind ( self.attributes [index] ["arffType"] )
+
+      # only numbers can be zero, not e.g. False of a bool column
+      if ( kind in ( "real", "integer" ) ) and ( column.dtype.kind in "fiu" ) :
+        text = text.where ( column.to_numpy () != 0, "" )
+
+      entries.append ( text.tolist () )
+
+    lines = [ "{" + ",".join ( [ entry for entry in row if entry ] ) + "}"
+              for row in zip ( *entries ) ]
+
+    return lines
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getSparseTextCsr  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This  function converts  the csr matrix  of data loaded  in sparse
+  #   mode into lines  in the sparse ARFF format. Codes of nominal attri-
+  #   butes are converted back to their values,  weights not equal to 1 are
+  #   appended.
+  #
+  #-------------------------------------------------------------------------
+
+  def getSparseTextCsr (self) -> list :
+
+    csr = self.sparseMat
+
+    data    = np.asarray (csr.data)
+    indices = np.asarray (csr.indices)
+    indptr  = np.asarray (csr.indptr)
+
+    finite  = np.isfinite (data)
+    integer = finite & ( data == np.trunc (data) )
+
+    values = np.where ( integer, np.where ( integer, data, 0 )
+                        .astype (np.int64).astype (str),
+                        data.astype (str) ).astype (object)
+
+    values [ np.isnan (data) ] = "?"
+
+    for col in range ( 0, len (self.attributes) ) :
+      info = self.attributes [col]
+
+      if getAttrKind ( info ["arffType"] ) != "nominal" :
+        continue
+
+      categories = info.get ( "categories" ) or \
+                   getCategories ( info ["arffType"] )
+      mask = ( indices == col ) & finite
+
+      names = pd.Series ( categories, dtype = object )
+      names = self.formatColumn ( col, names ).to_numpy ()
+
+      values [mask] = names.take ( data [mask].astype (np.int64) )
+
+    entries = ( pd.Series ( indices.astype (str), dtype = object ) + " " +
+                pd.Series ( values, dtype = object ) ).tolist ()
+
+    lines = []
+
+    for row in range ( 0, len (indptr) - 1 ) :
+      line = "{" + ",".join ( entries [ indptr [row] : indptr [row + 1] ] ) \
+             + "}"
+
+      if ( self.weights is not None ) and ( self.weights [row] != 1.0 ) :
+        line = line + ", {" + str ( self.weights [row] ) + "}"
+
+      lines.append (line)
+
+    return lines
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  saveDataFrame  of  ArffConv
+  #
+  #  Description :
+  #
+  #   This function  saves data and header in  ARFF format in a file
+  #   with the defined filename.  A file name with the extension .gz, .bz2
+  #   or .xz is written compressed (see FileUtils.openFile).
+  #
   #  Output parameter :
   #   success         : Success, true or false
   #
   #-------------------------------------------------------------------------
 
-  def saveDataFrame ( self, fileName : str = "" ) :
+  def saveDataFrame ( self, fileName : str = "", compressLevel : int = None ) :
 
-    if ( self.isValid == False ) :
+    if ( self.isValid == False ) or not self.ensureData () :
       return False
 
     if not fileName :
       fileName = self.fileName
 
-    self.dataFrame.to_csv ( fileName, index = False, sep = self.delimiter )
+    with FileUtils.openFile ( fileName, "w", compressLevel ) as hfile :
+      self.dataFrame.to_csv ( hfile, index = False, sep = self.delimiter,
+                              lineterminator = "\n" )
 
 
   #-------------------------------------------------------------------------
@@ -1112,3 +2641,25 @@ class ArffConv :
     self.fileUtils.setFileName (fileName)
 
 
+#-------------------------------------------------------------------------
+#
+#  Function name :  iterArff  of  ArffConv
+#
+#  Description :
+#
+#   This function is a generator  which yields the data rows of the given
+#   ARFF file as  string lists without loading  the whole file.  See also
+#   'ArffConv.iterRows'.
+#
+#   Example :
+#    for row in ArffConv.iterArff ( "Data/weather.arff" ) :
+#      print (row)
+#
+#-------------------------------------------------------------------------
+
+def iterArff ( fileName : str, withWeight : bool = False ) :
+
+  arff = ArffConv ()
+  arff.setFileName (fileName)
+
+  yield from arff.iterRows (withWeight)
@@ -0,0 +1,274 @@
+#-------------------------------------------------------------------------
+#
+#  File Name   :  ArffDataset
+#
+#  Description :
+#
+#   This module contains a stateless API for ARFF files and a thread-safe
+#   wrapper of 'ArffConv'.
+#
+#   'readArff' and 'writeArff' use a new 'ArffConv' instance for every call,
+#   the content is handed over as 'Dataset'.  Nothing is kept between the
+#   calls, so they can be called from many threads at the same time.  A
+#   binary cache (ArffCache) can be shared by all calls.
+#
+#   'LockedArffConv' serializes all calls of one 'ArffConv' instance with a
+#   lock, so one instance can be used by several threads.
+#
+#   Example :
+#    cache = ArffCache ( "/tmp/arffcache" )
+#
+#    with concurrent.futures.ThreadPoolExecutor (8) as executor :
+#      datasets = list ( executor.map (
+#                   lambda name : readArff ( name, cache = cache ), names ) )
+#
+#    writeArff ( datasets [0], "Out/first.arff.gz" )
+#
+#  This unit contains following functions :
+#   of ArffDataset :
+#    readArff                  writeArff
+#
+#  This class contains following member functions :
+#   of Dataset :
+#    Dataset                   fromDataFrame             getAttributeNames
+#
+#   of LockedArffConv :
+#    LockedArffConv            callLocked                iterLocked
+#
+#-------------------------------------------------------------------------
+
+import copy
+import threading
+import types
+
+from ArffConv import ArffConv
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  Dataset
+#
+#  Description :
+#
+#   This class holds the content of an ARFF file : relation, attribute maps
+#   (see ArffConv.getAttributes), the data as pandas data frame and for a
+#   sparse load the scipy csr matrix and the weights.
+#
+#-------------------------------------------------------------------------
+
+class Dataset :
+
+  #  The constructor stores the given content.
+
+  def __init__ ( self, relation : str = "", attributes : list = None,
+                 dataFrame = None, sparseMatrix = None, weights = None ) :
+
+    self.relation     = relation
+    self.attributes   = attributes if attributes is not None else []
+    self.dataFrame    = dataFrame
+    self.sparseMatrix = sparseMatrix
+    self.weights      = weights
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getAttributeNames  of  Dataset
+  #
+  #  Description :
+  #
+  #   This function returns the names of the attributes.
+  #
+  #-------------------------------------------------------------------------
+
+  def getAttributeNames (self) -> list :
+
+    return [ info ["name"] for info in self.attributes ]
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  fromDataFrame  of  Dataset
+  #
+  #  Description :
+  #
+  #   This function creates a dataset from a pandas data frame.  The attri-
+  #   butes are derived from the column types (see ArffConv.setDataFrame).
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def fromDataFrame ( dataFrame, relation : str = "", **options ) :
+
+    arff = ArffConv ()
+    arff.setDataFrame ( dataFrame, **options )
+
+    return Dataset ( relation, arff.getAttributes (), arff.getDataFrame () )
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  readArff  of  ArffDataset
+#
+#  Description :
+#
+#   This function loads an ARFF file and returns its content as dataset,
+#   None if the file cannot be loaded.  The options are those of loadArff
+#   (e.g. engine, columns, where, sparse), a lazy load is not supported.
+#
+#  Input parameter  :
+#   fileName        : name of the ARFF file
+#   cache           : optional binary cache (ArffCache), may be shared
+#
+#-------------------------------------------------------------------------
+
+def readArff ( fileName : str, cache = None, **options ) -> Dataset :
+
+  if options.get ( "lazy" ) :
+    raise ValueError ( "readArff does not support a lazy load" )
+
+  arff = ArffConv ()
+  arff.setFileName (fileName)
+  arff.cache = cache
+
+  if not arff.loadArff ( **options ) :
+    return None
+
+  return Dataset ( arff.getDescription (), arff.getAttributes (),
+                   arff.dataFrame, arff.getSparseMatrix (),
+                   arff.getWeights () )
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  writeArff  of  ArffDataset
+#
+#  Description :
+#
+#   This function writes a dataset as ARFF file.  The options are those of
+#   saveArff ( sparse, compressLevel ).  The dataset is not changed.
+#
+#  Output parameter :
+#   success         : Success, true or false
+#
+#-------------------------------------------------------------------------
+
+def writeArff ( dataset : Dataset, fileName : str, **options ) -> bool :
+
+  if dataset.dataFrame is None :
+    return False
+
+  arff = ArffConv ()
+
+  arff.relation   = dataset.relation
+  arff.attributes = copy.deepcopy ( dataset.attributes )
+  arff.attrNames  = dataset.getAttributeNames ()
+  arff.dataFrame  = dataset.dataFrame
+  arff.isValid    = True
+
+  return arff.saveArff ( fileName, **options )
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  LockedArffConv
+#
+#  Description :
+#
+#   This class wraps an 'ArffConv' instance, every call of a member func-
+#   tion holds a reentrant lock.  Generators (e.g. iterRows) hold the lock
+#   for every step.  Returned objects (e.g. the data frame) are not copied
+#   and must not be changed by several threads.  Several calls which must
+#   not be interrupted by other threads are put into a 'with' block.
+#
+#   Example :
+#    arff = LockedArffConv ()
+#
+#    with arff :
+#      arff.setFileName ( "Data/iris.arff" )
+#      arff.loadArff ()
+#      df = arff.getDataFrame ()
+#
+#-------------------------------------------------------------------------
+
+class LockedArffConv :
+
+  #  The constructor wraps the given instance or a new one.
+
+  def __init__ ( self, arff : ArffConv = None ) :
+
+    self.arff = arff if arff is not None else ArffConv ()
+    self.lock = threading.RLock ()
+
+
+  def __enter__ (self) :
+
+    self.lock.acquire ()
+
+    return self
+
+
+  def __exit__ ( self, excType, excValue, traceback ) :
+
+    self.lock.release ()
+
+
+  #  Member functions of the wrapped instance are called with the lock.
+
+  def __getattr__ ( self, name : str ) :
+
+    value = getattr ( self.arff, name )
+
+    if not callable (value) :
+      return value
+
+    return lambda *args, **kwargs : self.callLocked ( value, args, kwargs )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  callLocked  of  LockedArffConv
+  #
+  #  Description :
+  #
+  #   This function calls the given member function with the lock.  A re-
+  #   turned generator is wrapped by 'iterLocked'.
+  #
+  #-------------------------------------------------------------------------
+
+  def callLocked ( self, func, args : tuple, kwargs : dict ) :
+
+    with self.lock :
+      result = func ( *args, **kwargs )
+
+    if isinstance ( result, types.GeneratorType ) :
+      return self.iterLocked (result)
+
+    return result
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  iterLocked  of  LockedArffConv
+  #
+  #  Description :
+  #
+  #   This function is a generator which takes every value of the given
+  #   generator with the lock.
+  #
+  #-------------------------------------------------------------------------
+
+  def iterLocked ( self, generator ) :
+
+    try :
+      while True :
+        with self.lock :
+          try :
+            value = next (generator)
+          except StopIteration :
+            return
+
+        yield value
+
+    finally :
+      with self.lock :
+        generator.close ()
@@ -0,0 +1,474 @@
+#-------------------------------------------------------------------------
+#
+#  File Name   :  ArffIndex
+#
+#  Description :
+#
+#   This module contains the class 'ArffIndex' which records  the byte
+#   offset of  the data section  of an ARFF  file and of every  n-th data
+#   line.  With the  index a range of rows can be read by seeking directly
+#   to  the nearest  recorded line  instead of scanning  the file from the
+#   top.  The index can be stored as sidecar file next to the ARFF file
+#   (<name>.arff.idx) and is only used if size and modification time of
+#   the ARFF file are unchanged.
+#
+#  This class contains following member functions :
+#   of ArffIndex :
+#    ArffIndex                 build                     countRows
+#    estimateRows              findDataOffset            findRow
+#    getIndexName              isCurrent                 isDataLine
+#    load                      readData                  readLines
+#    save                      scanLines
+#
+#-------------------------------------------------------------------------
+
+import json
+import mmap
+import os
+import re
+
+from FileUtils import FileUtils, READ_ERRORS
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  ArffIndex
+#
+#  Description :
+#
+#   This class builds, stores and uses a byte offset index of the data
+#   lines of an ARFF file.
+#
+#   Example :
+#    index = ArffIndex ( "Data/iris.arff", step = 1000 )
+#
+#    if not index.load () :
+#      index.build ()
+#      index.save  ()
+#
+#    lines = index.readLines ( 100, 200 )
+#
+#-------------------------------------------------------------------------
+
+class ArffIndex :
+
+  #  The constructor initializes some variables.
+
+  def __init__ ( self, fileName : str = "", step : int = 1000 ) :
+
+    self.fileName   = fileName
+    self.step       = step     # every n-th data line is recorded
+    self.dataOffset = -1       # offset of the first line after @DATA
+    self.offsets    = []       # offsets of the lines 0, step, 2 * step ...
+    self.rows       = 0        # number of data lines
+    self.size       = -1       # size of the ARFF file
+    self.mtime      = -1       # modification time of the ARFF file (ns)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getIndexName  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function returns the name of the sidecar file of the index.
+  #
+  #-------------------------------------------------------------------------
+
+  def getIndexName (self) -> str :
+
+    return self.fileName + ".idx"
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  isDataLine  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function checks if the given line (bytes) of the data section
+  #   contains data, i.e. it is neither empty nor a comment.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def isDataLine ( line : bytes ) -> bool :
+
+    line = line.strip ()
+
+    return bool (line) and not line.startswith ( b"%" )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  findDataOffset  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function reads the header lines  of the given binary file (or
+  #   mmap) from the current position and  returns the offset of the first
+  #   line after '@DATA' or -1 if the line is not found.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def findDataOffset (hfile) -> int :
+
+    regex = re.compile ( rb"^\s*@data", re.IGNORECASE )
+
+    line = hfile.readline ()
+
+    while line :
+      if regex.match (line) :
+        return hfile.tell ()
+
+      line = hfile.readline ()
+
+    return -1
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  countRows  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function counts the data lines of the given mmap from 'offset'
+  #   to the end.  The newlines are counted in blocks and the empty and
+  #   comment lines (see isDataLine) are subtracted, no line is decoded.
+  #   A binary stream (e.g. a compressed file) is read line by line.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def countRows ( mm, offset : int, blockSize : int = 1 << 24 ) -> int :
+
+    if not isinstance ( mm, mmap.mmap ) :
+      mm.seek (offset)
+      return sum ( 1 for line in mm if ArffIndex.isDataLine (line) )
+
+    end = len (mm)
+
+    while ( end > offset ) and mm [ end - 1 : end ].isspace () :
+      end = end - 1      # trailing empty lines
+
+    if end <= offset :
+      return 0
+
+    lines = 1            # the last line has no newline after the strip
+
+    for pos in range ( offset, end, blockSize ) :
+      lines = lines + mm [ pos : min ( pos + blockSize, end ) ].count ( b"\n" )
+
+    # lines which are empty or start with '%' (after blanks)
+    regex = re.compile ( rb"^[ \t\r\f\v]*(?:%|\n)", re.MULTILINE )
+
+    skip = sum ( 1 for _ in regex.finditer ( mm, offset, end ) )
+
+    return lines - skip
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  estimateRows  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function estimates the number of data lines of the given mmap
+  #   from 'offset' to the end.  The average line length is taken from
+  #   'samples' blocks spread over the data section, the size of the data
+  #   section divided by it gives the estimate.  Small files are counted
+  #   exactly (see countRows).
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def estimateRows ( mm, offset : int, samples : int = 16,
+                     sampleBytes : int = 1 << 16 ) -> int :
+
+    size = len (mm) - offset
+
+    if size <= samples * sampleBytes :
+      return ArffIndex.countRows ( mm, offset )
+
+    length = 0
+    rows   = 0
+
+    for idx in range (samples) :
+      pos   = offset + idx * ( size - sampleBytes ) // ( samples - 1 or 1 )
+      block = mm [ pos : pos + sampleBytes ]
+
+      if idx > 0 :        # skip the partial line at the block start
+        block = block [ block.find ( b"\n" ) + 1 : ]
+
+      block = block [ : block.rfind ( b"\n" ) + 1 ]
+
+      for line in block.splitlines ( keepends = True ) :
+        length = length + len (line)
+
+        if ArffIndex.isDataLine (line) :
+          rows = rows + 1
+
+    if length == 0 :
+      return 0
+
+    return int ( round ( size * rows / length ) )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  build  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function reads the ARFF file once through mmap and records the
+  #   offset of the data section and of every 'step'-th data line.  A com-
+  #   pressed file is read as stream, the offsets are then positions in
+  #   the decompressed content.
+  #
+  #-------------------------------------------------------------------------
+
+  def build (self) -> bool :
+
+    if self.step < 1 :
+      raise ValueError ( "step must be a positive integer" )
+
+    self.dataOffset = -1
+    self.offsets    = []
+    self.rows       = 0
+
+    try :
+      stat = os.stat (self.fileName)
+
+      with FileUtils.openFile ( self.fileName, "rb" ) as hfile :
+        if stat.st_size == 0 :
+          return False
+
+        if FileUtils.getCompression (self.fileName) is not None :
+          found = self.scanLines (hfile)
+        else :
+          with mmap.mmap ( hfile.fileno (), 0, access = mmap.ACCESS_READ ) \
+               as mm :
+            found = self.scanLines (mm)
+
+        if not found :
+          return False
+
+    except READ_ERRORS :
+      msg = "Cannot open file : " + self.fileName + " for reading !"
+      print (msg)
+
+      return False
+
+    self.size  = stat.st_size
+    self.mtime = stat.st_mtime_ns
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  scanLines  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function records the offsets of the data section and of every
+  #   'step'-th data line of the given mmap or binary stream (see build).
+  #
+  #-------------------------------------------------------------------------
+
+  def scanLines ( self, data ) -> bool :
+
+    self.dataOffset = self.findDataOffset (data)
+
+    if self.dataOffset < 0 :
+      return False
+
+    rows = 0
+    pos  = data.tell ()
+    line = data.readline ()
+
+    while line :
+      if self.isDataLine (line) :
+        if rows % self.step == 0 :
+          self.offsets.append (pos)
+
+        rows = rows + 1
+
+      pos  = data.tell ()
+      line = data.readline ()
+
+    self.rows = rows
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  save  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function writes the index as sidecar file next to the ARFF file.
+  #
+  #-------------------------------------------------------------------------
+
+  def save (self) -> bool :
+
+    content = { "step"       : self.step,
+                "dataOffset" : self.dataOffset,
+                "rows"       : self.rows,
+                "size"       : self.size,
+                "mtime"      : self.mtime,
+                "offsets"    : self.offsets }
+
+    try :
+      with open ( self.getIndexName (), "w", encoding = "utf8" ) as hfile :
+        json.dump ( content, hfile )
+
+    except ( PermissionError, OSError ) :
+      msg = "Cannot open file : " + self.getIndexName () + " for writing !"
+      print (msg)
+
+      return False
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  load  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function reads the  index from the sidecar  file.  It returns
+  #   false if there is no sidecar file or if the ARFF file was changed
+  #   since the index was built (different size or modification time).
+  #
+  #-------------------------------------------------------------------------
+
+  def load (self) -> bool :
+
+    try :
+      stat = os.stat (self.fileName)
+
+      with open ( self.getIndexName (), "r", encoding = "utf8" ) as hfile :
+        content = json.load (hfile)
+
+    except ( OSError, ValueError ) :
+      return False
+
+    if ( content.get ( "size" ) != stat.st_size ) or \
+       ( content.get ( "mtime" ) != stat.st_mtime_ns ) :
+      return False       # stale index
+
+    self.step       = content ["step"]
+    self.dataOffset = content ["dataOffset"]
+    self.rows       = content ["rows"]
+    self.size       = content ["size"]
+    self.mtime      = content ["mtime"]
+    self.offsets    = content ["offsets"]
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  isCurrent  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function checks if the index is built and the ARFF file is not
+  #   changed since then.
+  #
+  #-------------------------------------------------------------------------
+
+  def isCurrent (self) -> bool :
+
+    try :
+      stat = os.stat (self.fileName)
+    except OSError :
+      return False
+
+    return ( self.dataOffset >= 0 ) and ( self.size == stat.st_size ) and \
+           ( self.mtime == stat.st_mtime_ns )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  findRow  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function returns  the offset of the nearest recorded  data line
+  #   before the given row and the number of data lines to skip from there.
+  #
+  #-------------------------------------------------------------------------
+
+  def findRow ( self, row : int ) -> tuple :
+
+    block = row // self.step
+
+    return self.offsets [block], row - block * self.step
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readLines  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function returns the data lines of the rows start to stop - 1
+  #   (like a slice) as string list.  The file is mapped into memory and
+  #   only the lines of the range are read.
+  #
+  #-------------------------------------------------------------------------
+
+  def readLines ( self, start : int, stop : int ) -> list :
+
+    start = max ( start, 0 )
+    stop  = min ( stop, self.rows )
+
+    lines = []
+
+    if start >= stop :
+      return lines
+
+    offset, skip = self.findRow (start)
+    count        = stop - start + skip
+
+    with FileUtils.openFile ( self.fileName, "rb" ) as hfile :
+      if FileUtils.getCompression (self.fileName) is not None :
+        self.readData ( hfile, offset, count, lines )
+      else :
+        with mmap.mmap ( hfile.fileno (), 0, access = mmap.ACCESS_READ ) \
+             as mm :
+          self.readData ( mm, offset, count, lines )
+
+    return lines [ skip : ]
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readData  of  ArffIndex
+  #
+  #  Description :
+  #
+  #   This function appends 'count' data lines from the given offset of a
+  #   mmap or binary stream to the string list (see readLines).  A stream
+  #   of a compressed file seeks by decompressing up to the offset.
+  #
+  #-------------------------------------------------------------------------
+
+  def readData ( self, data, offset : int, count : int, lines : list ) :
+
+    data.seek (offset)
+
+    while len (lines) < count :
+      line = data.readline ()
+
+      if not line :
+        break
+
+      if self.isDataLine (line) :
+        lines.append ( line.decode ( "utf8" ).rstrip ( "\r\n" ) )
@@ -0,0 +1,1205 @@
+#-------------------------------------------------------------------------
+#
+#  File Name   :  ArffParser
+#
+#  Description :
+#
+#   This module contains  the class 'ArffParser' which  parses the data
+#   section of an ARFF file in a single pass.  The values of every line
+#   are tokenized once and collected  in blocks. Every block is then con-
+#   verted column by column  into typed buffers  (numpy arrays for nume-
+#   ric attributes, integer codes for nominal attributes).  The types are
+#   taken from the attributes of the header.
+#
+#  This unit contains following functions :
+#   of ArffParser :
+#    cleanValue                evalWhere                 formatDates
+#    getAttrKind               getCategories             getConditions
+#    getIntType                parseDates                parseRange
+#    splitValues               toFloatArray              translateDateFormat
+#
+#  This class contains following member functions :
+#   of ArffParser :
+#    ArffParser                addCategory               appendColumn
+#    convertColumn             expandSparse              filterBlock
+#    flush                     getColumns                getDataFrame
+#    getNumType                nRows                     parseLine
+#    parseLines                parseSparse               reset
+#
+#-------------------------------------------------------------------------
+
+import array
+import csv
+import functools
+import itertools
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  getAttrKind  of  ArffParser
+#
+#  Description :
+#
+#   This function evaluates the given ARFF type of an attribute and re-
+#   turns the kind of the attribute as string.  The keywords are case-
+#   insensitive.
+#
+#   Example :
+#    REAL             --> real
+#    NUMERIC          --> integer
+#    {yes,no}         --> nominal
+#    DATE "HH:mm"     --> date
+#    STRING           --> string
+#
+#-------------------------------------------------------------------------
+
+def getAttrKind ( arffType : str ) -> str :
+
+  text = arffType.strip ().lower ()
+
+  if text == "real" :
+    return "real"
+
+  if ( text == "integer" ) or ( text == "numeric" ) :
+    return "integer"
+
+  if text.startswith ( "date" ) :
+    return "date"
+
+  if text.startswith ( "{" ) :
+    return "nominal"
+
+  return "string"
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  getCategories  of  ArffParser
+#
+#  Description :
+#
+#   This function returns the  values of a nominal attribute in the order
+#   of the declaration as string list.
+#
+#   Example :
+#    {sunny, overcast, 'very rainy'}  --> [ sunny, overcast, very rainy ]
+#
+#-------------------------------------------------------------------------
+
+def getCategories ( arffType : str ) -> list :
+
+  text = arffType.strip ()
+  text = text [ 1 : text.rfind ( "}" ) ]
+
+  return [ cleanValue (value) for value in splitValues (text) ]
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  cleanValue  of  ArffParser
+#
+#  Description :
+#
+#   This function removes leading and trailing white spaces and quotes of
+#   a single value.
+#
+#-------------------------------------------------------------------------
+
+def cleanValue ( value : str ) -> str :
+
+  value = value.strip ()
+
+  if ( len (value) > 1 ) and ( value [0] in "'\"" ) and \
+     ( value [-1] == value [0] ) :
+    value = value [ 1 : -1 ]
+
+  return value
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  splitValues  of  ArffParser
+#
+#  Description :
+#
+#   This function splits  a line with comma separated  values. Only if the
+#   line contains quotes the  csv module is used, quoted  values may then
+#   contain commas.
+#
+#-------------------------------------------------------------------------
+
+def splitValues ( line : str ) -> list :
+
+  idx1 = line.find ( '"' )
+  idx2 = line.find ( "'" )
+
+  if ( idx1 < 0 ) and ( idx2 < 0 ) :
+    return line.split ( "," )
+
+  # use the quote character which is found first
+  if ( idx2 < 0 ) or ( ( idx1 >= 0 ) and ( idx1 < idx2 ) ) :
+    quote = '"'
+  else :
+    quote = "'"
+
+  reader = csv.reader ( [ line ], quotechar = quote, escapechar = "\\",
+                        skipinitialspace = True )
+
+  return next (reader)
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  toFloatArray  of  ArffParser
+#
+#  Description :
+#
+#   This function converts the given string values to a numpy array with
+#   floating  point values.  Missing values  ('?') are  converted to NaN.
+#   The fast conversion of numpy is tried first.
+#
+#-------------------------------------------------------------------------
+
+def toFloatArray ( values ) -> np.ndarray :
+
+  try :
+    return np.array ( values, dtype = np.float64 )
+
+  except ValueError :
+    pass
+
+  result = np.empty ( len (values), dtype = np.float64 )
+
+  for idx in range ( 0, len (values) ) :
+    value = cleanValue ( values [idx] )
+
+    if ( value == "?" ) or ( not value ) :
+      result [idx] = np.nan
+    else :
+      result [idx] = float (value)
+
+  return result
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  getIntType  of  ArffParser
+#
+#  Description :
+#
+#   This function returns the smallest signed integer type which holds
+#   all values in the given range.
+#
+#-------------------------------------------------------------------------
+
+def getIntType ( low, high ) -> np.dtype :
+
+  for dtype in ( np.int8, np.int16, np.int32 ) :
+    info = np.iinfo (dtype)
+
+    if ( info.min <= low ) and ( high <= info.max ) :
+      return np.dtype (dtype)
+
+  return np.dtype ( np.int64 )
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  translateDateFormat  of  ArffParser
+#
+#  Description :
+#
+#   This function converts the ARFF date / time format (Java's Simple-
+#   DateFormat) to  the format  of python's strftime.  The results are
+#   cached, the same format is translated only once.
+#
+#   Example :
+#    "yyyy-MM-dd HH:mm:ss"  -->  ( "%Y-%m-%d %H:%M:%S", False )
+#    "HH:mm"                -->  ( "%H:%M", True )
+#
+#  Output parameter :
+#   (tuple)         : format for python, only a time without date
+#
+#-------------------------------------------------------------------------
+
+@functools.lru_cache ( maxsize = 256 )
+def translateDateFormat ( arffDate : str ) -> tuple :
+
+  dateStr = arffDate.strip ()
+  dateStr = dateStr.replace ( '"', "" )
+  dateStr = dateStr.replace ( "\'", "" )
+
+  # convert time dateStr from Java's SimpleDateFormat to C's format
+  dateFormat = None
+  onlyTime   = True
+
+  if "yyyy" in dateStr :
+    dateStr = dateStr.replace ( "yyyy", "%Y" )
+    dateFormat = "Y"
+    onlyTime   = False
+  elif "yy" in dateStr :
+    dateStr = dateStr.replace ( "yy", "%y" )
+    dateFormat = "Y"
+    onlyTime   = False
+
+  if "MM" in dateStr :
+    dateStr = dateStr.replace ( "MM", "%m" )
+    dateFormat = "M"
+    onlyTime   = False
+
+  if "dd" in dateStr :
+    dateStr = dateStr.replace ( "dd", "%d" )
+    dateFormat = "D"
+    onlyTime   = False
+
+  if "HH" in dateStr :
+    dateStr = dateStr.replace ( "HH", "%H" )
+    dateFormat = "h"
+
+  if "mm" in dateStr :
+    dateStr = dateStr.replace ( "mm", "%M" )
+    dateFormat = "m"
+
+  if "ss" in dateStr :
+    dateStr = dateStr.replace ( "ss", "%S" )
+    dateFormat = "s"
+
+  if "z" in dateStr or "Z" in dateStr :
+      raise ValueError ( "Date type attributes with time zone not "
+                         "supported, yet" )
+
+  if dateFormat is None:
+    raise ValueError ( "Invalid or unsupported date format" )
+
+  return dateStr, onlyTime
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  parseDates  of  ArffParser
+#
+#  Description :
+#
+#   This function converts  a column with date  strings into datetime64
+#   values, for a format with only a time into timedelta64 values (time
+#   since midnight).  Only the distinct strings are parsed, the results
+#   are mapped back with the  codes of 'pd.factorize'.  Missing values
+#   (None, NaN) give NaT.  Columns already converted are returned as is.
+#
+#-------------------------------------------------------------------------
+
+def parseDates ( column : pd.Series, dateFormat : str,
+                 onlyTime : bool = False ) -> pd.Series :
+
+  if column.dtype.kind in "mM" :
+    return column
+
+  codes, uniques = pd.factorize ( column )
+
+  parsed = pd.to_datetime ( uniques, format = dateFormat )
+
+  if onlyTime :
+    parsed = parsed - parsed.normalize ()
+
+  values = parsed.to_numpy ()
+  values = np.concatenate ( ( values, np.array ( [ "NaT" ],
+                                                 dtype = values.dtype ) ) )
+
+  # code -1 (missing value) takes the last value NaT
+  return pd.Series ( values [codes], index = column.index,
+                     name = column.name )
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  formatDates  of  ArffParser
+#
+#  Description :
+#
+#   This function converts a datetime64 or timedelta64 column into strings
+#   with the given strftime format.  Time  differences are formatted as
+#   time of day.  Only the distinct values are formatted and mapped back
+#   with the codes of 'pd.factorize'.  Missing values give NaN.
+#
+#-------------------------------------------------------------------------
+
+def formatDates ( column : pd.Series, dateFormat : str ) -> pd.Series :
+
+  codes, uniques = pd.factorize ( column )
+
+  if column.dtype.kind == "m" :
+    uniques = pd.Timestamp ( "1900-01-01" ) + uniques
+
+  text = np.append ( uniques.strftime (dateFormat).to_numpy ( dtype = object ),
+                     np.nan )
+
+  # code -1 (missing value) takes the last value NaN
+  return pd.Series ( text [codes], index = column.index, name = column.name )
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  getConditions  of  ArffParser
+#
+#  Description :
+#
+#   This function checks a row filter  (see evalWhere) and returns it as
+#   list of conditions ( name, operator, value ), None for a callable.
+#
+#-------------------------------------------------------------------------
+
+def getConditions ( where ) -> list :
+
+  if callable (where) :
+    return None
+
+  if isinstance ( where, tuple ) :
+    where = [ where ]
+
+  if not isinstance ( where, list ) :
+    raise ValueError ( "Unsupported row filter : " + str (where) )
+
+  for condition in where :
+    if ( not isinstance ( condition, tuple ) ) or ( len (condition) != 3 ) :
+      raise ValueError ( "Unsupported condition : " + str (condition) )
+
+    if condition [1] not in _OPERATORS :
+      raise ValueError ( "Unsupported operator : " + str ( condition [1] ) )
+
+  return where
+
+
+# operators of the conditions of a row filter
+_OPERATORS = { "==" : operator.eq, "!=" : operator.ne,
+               "<"  : operator.lt, "<=" : operator.le,
+               ">"  : operator.gt, ">=" : operator.ge,
+               "in" : None,        "not in" : None }
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  evalWhere  of  ArffParser
+#
+#  Description :
+#
+#   This function evaluates a row filter for the given typed columns (data
+#   frame or map of name and column) and returns a boolean numpy array,
+#   true for the rows to keep.  The filter is :
+#    callable        : called with a data frame, returns a boolean mask
+#    tuple           : a condition ( name, operator, value ), operators are
+#                      ==, !=, <, <=, >, >=, in, not in
+#    list            : a list of conditions, all must be true
+#
+#   Values of date attributes are compared as timestamps (time only as
+#   time differences), missing values never match.
+#
+#   Example :
+#    ( "class", "==", "Iris-setosa" )
+#    [ ( "Date", ">=", "2023-05-01" ), ( "Date", "<", "2023-05-08" ) ]
+#    lambda df : df ["sepallength"] > 2 * df ["sepalwidth"]
+#
+#-------------------------------------------------------------------------
+
+def evalWhere ( where, columns ) -> np.ndarray :
+
+  conditions = getConditions (where)
+
+  if conditions is None :
+    if not isinstance ( columns, pd.DataFrame ) :
+      columns = pd.DataFrame (columns)
+
+    return np.asarray ( where (columns), dtype = bool )
+
+  mask = None
+
+  for name, op, value in conditions :
+    if name not in columns :
+      raise ValueError ( "Unknown attribute : " + str (name) )
+
+    column = pd.Series ( columns [name] )
+
+    if column.dtype.kind == "M" :
+      value = pd.Series (value).map ( pd.Timestamp ) if op.endswith ( "in" ) \
+              else pd.Timestamp (value)
+    elif column.dtype.kind == "m" :
+      value = pd.to_timedelta (value)
+
+    if op == "in" :
+      result = column.isin (value)
+    elif op == "not in" :
+      result = ~ column.isin (value) & column.notna ()
+    else :
+      result = _OPERATORS [op] ( column, value )
+
+      if op == "!=" :     # missing values never match
+        result = result & column.notna ()
+
+    result = result.to_numpy ( dtype = bool )
+    mask   = result if mask is None else mask & result
+
+  return mask
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  parseRange  of  ArffParser
+#
+#  Description :
+#
+#   This function parses the data lines  in the given byte range of an
+#   ARFF file and returns them as pandas data frame with an additional
+#   column "weight".  The range must start and  end at a line border.  It
+#   is used by the worker processes of 'ArffConv.buildParallel'.  With
+#   'columns' only the attributes with these indexes are parsed, with
+#   'where' only the rows which match the filter are kept (see evalWhere).
+#
+#  Output parameter :
+#   (tuple)         : data frame, weights found, sparse lines found
+#
+#-------------------------------------------------------------------------
+
+def parseRange ( fileName : str, start : int, end : int,
+                 attributes : list, downcast = False,
+                 columns : list = None, where = None ) -> tuple :
+
+  with open ( fileName, "rb" ) as hfile :
+    hfile.seek (start)
+    text = hfile.read ( end - start ).decode ( "utf8" )
+
+  parser = ArffParser ( attributes, downcast, columns, where )
+  parser.parseLines ( text.splitlines () )
+
+  return parser.getDataFrame ( 0, True ), parser.weight, parser.sparse
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  ArffParser
+#
+#  Description :
+#
+#   This class parses the lines of the  data section of an ARFF file into
+#   typed columns.  The lines are tokenized once  and collected in blocks
+#   of raw  values.  Every full  block is  converted column by  column and
+#   appended to the column buffers.
+#
+#   With 'downcast' numeric columns get smaller types,  the value ranges
+#   are tracked while the blocks are converted :
+#    False           : float64 and int64 (default)
+#    True            : float32 and the smallest integer type
+#    "float"         : only float32
+#    "integer"       : only the smallest integer type
+#
+#   With 'columns' ( ascending indexes of attributes ) only these attri-
+#   butes are parsed, the other values  are dropped right after the split
+#   and the fields after the last selected one are not split at all.
+#
+#   With 'where' every block is filtered (see evalWhere) after its values
+#   are converted,  rejected rows  never reach the column buffers.  Attri-
+#   butes of the conditions which are not selected are parsed for the
+#   filter only.
+#
+#   Example :
+#    parser = ArffParser (attributes)
+#    parser.parseLines  (lines)
+#    df = parser.getDataFrame ()
+#
+#-------------------------------------------------------------------------
+
+class ArffParser :
+
+  #  The constructor evaluates the kinds of the attributes
+
+  def __init__ ( self, attributes : list, downcast = False,
+                 columns : list = None, where = None ) :
+
+    self.names      = []       # names of the attributes
+    self.kinds      = []       # kinds of the attributes (see getAttrKind)
+    self.categories = []       # values of nominal attributes
+    self.lookups    = []       # value to code maps of nominal attributes
+    self.defaults   = []       # values not given in a sparse line
+
+    self.blockSize  = 65536    # number of lines converted at once
+    self.downcast   = downcast # smaller numeric types (see above)
+    self.sparse     = False    # sparse lines found
+    self.weight     = False    # weights found
+    self.regex      = re.compile ( r",\s*{.+?}$" )
+
+    self.width      = len (attributes)   # number of values in a line
+    self.select     = None     # indexes of the parsed attributes
+    self.positions  = None     # attribute index to column (sparse lines)
+    self.pick       = None     # takes the selected values of a line
+    self.maxSplit   = -1       # splits of a simple line
+    self.lineParts  = self.width
+    self.where      = where    # row filter (see evalWhere)
+    self.hidden     = set ()   # attributes parsed only for the filter
+    self.dateFormats = []      # strftime formats of date attributes
+
+    conditions = None if where is None else getConditions (where)
+    allNames   = [ info ["name"] for info in attributes ]
+
+    for name, op, value in ( conditions or [] ) :
+      if name not in allNames :
+        raise ValueError ( "Unknown attribute : " + str (name) )
+
+      if ( columns is not None ) and ( allNames.index (name) not in columns ) :
+        self.hidden.add (name)
+
+    if self.hidden :
+      columns = sorted ( set (columns) |
+                         { allNames.index (name) for name in self.hidden } )
+
+    if columns is not None :
+      self.select    = list (columns)
+      self.positions = { col : pos for pos, col in enumerate (self.select) }
+
+      if len (self.select) == 1 :
+        col       = self.select [0]
+        self.pick = lambda parts : ( parts [col], )
+      else :
+        self.pick = operator.itemgetter ( *self.select )
+
+      if self.select and ( self.select [-1] + 1 < self.width ) :
+        self.maxSplit  = self.select [-1] + 1  # the rest stays one string
+        self.lineParts = self.maxSplit + 1
+
+      attributes = [ attributes [col] for col in self.select ]
+
+    for info in attributes :
+      kind = getAttrKind ( info ["arffType"] )
+
+      categories = []
+      lookup     = { "?" : -1 }
+      default    = "0"
+      dateFormat = None
+
+      if kind == "date" :
+        text = info ["arffType"].strip () [ 4 : ].strip ()
+
+        if not text :      # already converted or default format
+          text = info.get ( "ARFF dateformat", "yyyy-MM-dd'T'HH:mm:ss" )
+
+        dateFormat = translateDateFormat (text)
+
+      if kind == "nominal" :
+        categories = getCategories ( info ["arffType"] )
+
+        for code in range ( 0, len (categories) ) :
+          lookup [ categories [code] ] = code
+
+        if categories :    # a missing value in a sparse line is the first
+          default = categories [0]
+
+      self.names.append ( info ["name"] )
+      self.kinds.append (kind)
+      self.categories.append (categories)
+      self.lookups.append (lookup)
+      self.defaults.append (default)
+      self.dateFormats.append (dateFormat)
+
+    self.nc = len (self.names)
+
+    self.reset ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  reset  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function deletes all parsed values. The categories of the nomi-
+  #   nal attributes are kept.
+  #
+  #-------------------------------------------------------------------------
+
+  def reset (self) :
+
+    self.nr           = 0
+    self.block        = []      # raw values of the current block
+    self.blockWeights = {}      # weights of the current block by position
+    self.buffers      = [ [] for col in range ( 0, self.nc ) ]
+    self.weights      = []      # weights as list of numpy arrays
+
+    # value ranges of the numeric columns, NaN is ignored
+    self.minimum      = [ np.inf ] * self.nc
+    self.maximum      = [ -np.inf ] * self.nc
+    self.missing      = [ False ] * self.nc     # contains NaN
+    self.integral     = [ True ] * self.nc      # only integral values
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  nRows  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function returns the number of parsed rows.
+  #
+  #-------------------------------------------------------------------------
+
+  def nRows (self) -> int :
+
+    return self.nr + len (self.block)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  parseLines  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function parses all  lines of the given list  or iterator. Empty
+  #   lines and comments are skipped.  Simple lines without quotes, weight
+  #   or sparse values are split directly, all others by 'parseLine'.
+  #
+  #-------------------------------------------------------------------------
+
+  def parseLines ( self, lines ) :
+
+    block    = self.block
+    cols     = self.lineParts
+    maxSplit = self.maxSplit
+    pick     = self.pick
+
+    for line in lines :
+
+      if ( not line ) or ( line [0] == "%" ) :
+        continue
+
+      if ( line [-1] != "}" ) and ( not '"' in line ) and \
+         ( not "'" in line ) :
+        parts = line.split ( ",", maxSplit )
+
+        if len (parts) == cols :
+          block.append ( parts if pick is None else pick (parts) )
+
+          if len (block) >= self.blockSize :
+            self.flush ()
+            block = self.block
+
+          continue
+
+      self.parseLine (line)
+      block = self.block
+
+    self.flush ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  parseLine  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function tokenizes  one line of the data section  and adds the
+  #   values to the current block.  An optional weight at the end of the
+  #   line and sparse lines are handled.
+  #
+  #-------------------------------------------------------------------------
+
+  def parseLine ( self, line : str ) :
+
+    if ( not line or line.startswith ( "%" ) ) :
+      return
+
+    weight = None
+
+    if line.endswith ( "}" ) :
+      result = self.regex.search (line)  # check for a weight at the line end
+
+      if result :
+        idx1, idx2 = result.span ()
+
+        weight = line [ idx1 + 1 : ].strip () [ 1 : -1 ]
+        line   = line [ 0 : idx1 ]
+
+        self.weight = True
+
+    if line.startswith ( "{" ) :
+      parts = self.expandSparse (line)
+    else :
+      parts = splitValues (line)
+
+      if len (parts) != self.width :
+        if len (parts) > self.width :
+          msg = "Too many values in data line : " + line
+          raise ValueError (msg)
+
+        parts.extend ( [ "?" ] * ( self.width - len (parts) ) )
+
+      if self.pick is not None :
+        parts = self.pick (parts)
+
+    if weight is not None :
+      self.blockWeights [ len (self.block) ] = weight
+
+    self.block.append (parts)
+
+    if len (self.block) >= self.blockSize :
+      self.flush ()
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  expandSparse  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function expands a sparse line to a list with all values. Not
+  #   given values are 0, for nominal attributes the first value.  Values
+  #   of attributes which are not selected are dropped.
+  #
+  #   Example :
+  #    {1 X, 3 Y}   -->   [ "0", "X", "0", "Y" ]
+  #
+  #-------------------------------------------------------------------------
+
+  def expandSparse ( self, line : str ) -> list :
+
+    self.sparse = True
+
+    parts = list (self.defaults)
+
+    line = line.strip () [ 1 : -1 ]
+
+    for entry in line.split ( "," ) :
+      key : list = entry.strip ().split ( " ", 1 )
+
+      if len (key) < 2 :     # empty sparse line
+        continue
+
+      col = int ( key [0] )
+
+      if self.positions is not None :
+        col = self.positions.get (col)
+
+        if col is None :     # attribute not selected
+          continue
+
+      parts [col] = key [1]
+
+    return parts
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  flush  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function converts  the values of the  current block column by
+  #   column and appends them to the typed column buffers.  With a filter
+  #   only the matching rows are appended.
+  #
+  #-------------------------------------------------------------------------
+
+  def flush (self) :
+
+    if not self.block :
+      return
+
+    columns = list ( zip ( *self.block ) )    # transpose the block
+    columns = [ self.convertColumn ( col, columns [col] )
+                for col in range ( 0, self.nc ) ]
+
+    weights = np.ones ( len (self.block), dtype = np.float64 )
+
+    for idx, value in self.blockWeights.items () :
+      weights [idx] = float (value)
+
+    if self.where is not None :
+      columns, weights = self.filterBlock ( columns, weights )
+
+    for col in range ( 0, self.nc ) :
+      self.appendColumn ( col, columns [col] )
+
+    self.weights.append (weights)
+
+    self.nr           = self.nr + len (weights)
+    self.block        = []
+    self.blockWeights = {}
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  filterBlock  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function evaluates the row filter for the converted columns of
+  #   a block and returns only the matching rows of columns and weights.
+  #   The filter sees nominal values as categoricals and dates as time-
+  #   stamps (see evalWhere).
+  #
+  #-------------------------------------------------------------------------
+
+  def filterBlock ( self, columns : list, weights : np.ndarray ) -> tuple :
+
+    conditions = getConditions (self.where)
+
+    if conditions is None :
+      names = self.names
+    else :
+      names = [ condition [0] for condition in conditions ]
+
+    view = {}
+
+    for name in dict.fromkeys (names) :
+      col    = self.names.index (name)
+      kind   = self.kinds [col]
+      values = columns [col]
+
+      if kind == "nominal" :
+        values = pd.Categorical.from_codes ( values, self.categories [col] )
+
+      elif kind == "date" :
+        dateFormat, onlyTime = self.dateFormats [col]
+        values = parseDates ( pd.Series ( values, dtype = object ),
+                              dateFormat, onlyTime )
+
+      elif kind == "string" :
+        values = np.array ( values, dtype = object )
+
+      view [name] = values
+
+    mask = evalWhere ( self.where, pd.DataFrame ( view ) )
+
+    if mask.all () :
+      return columns, weights
+
+    result = []
+
+    for col in range ( 0, self.nc ) :
+      values = columns [col]
+
+      if isinstance ( values, np.ndarray ) :
+        result.append ( values [mask] )
+      else :
+        result.append ( list ( itertools.compress ( values, mask ) ) )
+
+    return result, weights [mask]
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  convertColumn  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function converts the raw values of one column of a block to
+  #   the type of the attribute.  Numeric values give a float64 array,
+  #   nominal values an array with the codes, all others a string list.
+  #
+  #-------------------------------------------------------------------------
+
+  def convertColumn ( self, col : int, values : tuple ) :
+
+    kind = self.kinds [col]
+
+    if ( kind == "real" ) or ( kind == "integer" ) :
+      return toFloatArray (values)
+
+    if kind == "nominal" :
+      lookup = self.lookups [col]
+
+      codes = [ lookup.get ( value, -2 ) for value in values ]
+
+      for idx in range ( 0, len (codes) ) :
+        if codes [idx] == -2 :     # not yet known, e.g. quoted value
+          codes [idx] = self.addCategory ( col, values [idx] )
+
+      return np.array ( codes, dtype = np.int32 )
+
+    # string and date values
+    return [ None if value == "?" else cleanValue (value)
+             for value in values ]
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  appendColumn  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function appends the converted values of one column of a block
+  #   (see convertColumn) to  the column buffer and  tracks the value range
+  #   of numeric columns.
+  #
+  #-------------------------------------------------------------------------
+
+  def appendColumn ( self, col : int, values ) :
+
+    kind   = self.kinds [col]
+    buffer = self.buffers [col]
+
+    if ( kind == "real" ) or ( kind == "integer" ) :
+      buffer.append (values)
+
+      if len (values) :
+        self.minimum [col] = min ( self.minimum [col], np.fmin.reduce (values) )
+        self.maximum [col] = max ( self.maximum [col], np.fmax.reduce (values) )
+        self.missing [col] = self.missing [col] or \
+                             bool ( np.isnan (values).any () )
+
+        if ( kind == "integer" ) and self.integral [col] :
+          self.integral [col] = bool ( np.array_equal ( values,
+                                         np.trunc (values), equal_nan = True ) )
+      return
+
+    if kind == "nominal" :
+      buffer.append (values)
+      return
+
+    # string and date values
+    buffer.extend (values)
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  addCategory  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function returns the code  of a value of a nominal attribute
+  #   which is  not found in the  lookup map.  Values which are  not de-
+  #   clared in the header are appended to the categories.
+  #
+  #-------------------------------------------------------------------------
+
+  def addCategory ( self, col : int, value : str ) -> int :
+
+    lookup = self.lookups [col]
+    text   = cleanValue (value)
+
+    if text in lookup :
+      code = lookup [text]
+    else :
+      categories = self.categories [col]
+      code       = len (categories)
+
+      categories.append (text)
+      lookup [text] = code
+
+    lookup [value] = code     # remember also the raw value
+
+    return code
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getColumns  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function returns  the parsed columns as dictionary,  the name of
+  #   the attribute is the key.  Real attributes are float64, integer at-
+  #   tributes int64 (float64 if not  possible, see getNumType), nominal
+  #   attributes are categoricals with  the declared order of the values
+  #   and all other  attributes are object columns.  If 'withWeight' is
+  #   None the weight is added if any line contains a weight.
+  #
+  #-------------------------------------------------------------------------
+
+  def getColumns ( self, withWeight = None ) -> dict :
+
+    self.flush ()
+
+    columns = {}
+
+    for col in range ( 0, self.nc ) :
+      kind   = self.kinds [col]
+      buffer = self.buffers [col]
+
+      if self.names [col] in self.hidden :    # only for the row filter
+        continue
+
+      if ( kind == "real" ) or ( kind == "integer" ) :
+        values = np.concatenate (buffer) if buffer else np.empty ( 0 )
+        values = values.astype ( self.getNumType (col), copy = False )
+
+      elif kind == "nominal" :
+        codes = np.concatenate (buffer) if buffer else \
+                np.empty ( 0, dtype = np.int32 )
+
+        # code -1 is a missing value
+        values = pd.Categorical.from_codes ( codes, self.categories [col] )
+
+      else :
+        values = np.array ( buffer, dtype = object )
+
+      columns [ self.names [col] ] = values
+
+    if withWeight is None :
+      withWeight = self.weight
+
+    if withWeight :
+      weights = np.concatenate (self.weights) if self.weights else \
+                np.empty ( 0 )
+
+      columns [ "weight" ] = weights
+
+    return columns
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getNumType  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function returns the type of  a numeric column from the tracked
+  #   value range.  Integer attributes with missing or non integral values
+  #   are floating point, float32 only if the integers are exact.
+  #
+  #-------------------------------------------------------------------------
+
+  def getNumType ( self, col : int ) -> np.dtype :
+
+    toFloat = self.downcast in ( True, "float" )
+    toInt   = self.downcast in ( True, "integer" )
+
+    low  = self.minimum [col]
+    high = self.maximum [col]
+
+    if self.kinds [col] == "integer" :
+      if self.integral [col] and not self.missing [col] :
+        return getIntType ( low, high ) if toInt else np.dtype ( np.int64 )
+
+      if toFloat and self.integral [col] and \
+         ( max ( -low, high ) <= 2**24 ) :
+        return np.dtype ( np.float32 )
+
+      return np.dtype ( np.float64 )
+
+    return np.dtype ( np.float32 if toFloat else np.float64 )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getDataFrame  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function returns  the parsed columns as pandas data frame.  The
+  #   index starts with the given row number.
+  #
+  #-------------------------------------------------------------------------
+
+  def getDataFrame ( self, start : int = 0, withWeight = None ) :
+
+    columns = self.getColumns (withWeight)
+
+    index = pd.RangeIndex ( start, start + self.nr )
+
+    return pd.DataFrame ( columns, index = index )
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  parseSparse  of  ArffParser
+  #
+  #  Description :
+  #
+  #   This function parses all lines of the given list or iterator into the
+  #   arrays of a  compressed sparse row matrix (CSR).  Only values not equal
+  #   to zero are  stored, a  dense matrix is  never built.  Nominal values
+  #   are stored as code (index  of the declared value), the first value of
+  #   a nominal attribute is therefore zero like in Weka.  String and date
+  #   attributes are not supported.
+  #
+  #  Output parameter :
+  #   (tuple)         : data, indices, indptr and weights (None if the lines
+  #                     contain no weights) as numpy arrays
+  #
+  #-------------------------------------------------------------------------
+
+  def parseSparse ( self, lines ) -> tuple :
+
+    if self.where is not None :
+      raise ValueError ( "Sparse loading does not support a row filter" )
+
+    for col in range ( 0, self.nc ) :
+      if self.kinds [col] in ( "string", "date" ) :
+        msg = "Sparse loading does not support the " + self.kinds [col] + \
+              " attribute : " + self.names [col]
+        raise ValueError (msg)
+
+    data    = array.array ( "d" )
+    indices = array.array ( "i" )
+    indptr  = array.array ( "q", [ 0 ] )
+    weights = {}
+
+    nominal = [ kind == "nominal" for kind in self.kinds ]
+
+    for line in lines :
+
+      if ( not line or line.startswith ( "%" ) ) :
+        continue
+
+      if line.endswith ( "}" ) :
+        result = self.regex.search (line)  # check for a weight at the end
+
+        if result :
+          idx1, idx2 = result.span ()
+
+          weights [ len (indptr) - 1 ] = \
+            float ( line [ idx1 + 1 : ].strip () [ 1 : -1 ] )
+          line = line [ 0 : idx1 ]
+
+          self.weight = True
+
+      if line.startswith ( "{" ) :
+        self.sparse = True
+
+        entries = []
+
+        for entry in line.strip () [ 1 : -1 ].split ( "," ) :
+          key : list = entry.strip ().split ( " ", 1 )
+
+          if len (key) == 2 :
+            entries.append ( ( int ( key [0] ), key [1] ) )
+      else :
+        entries = enumerate ( splitValues (line) )
+
+      if self.positions is not None :    # only selected attributes
+        entries = [ ( self.positions [col], value ) for col, value in entries
+                    if col in self.positions ]
+
+      for col, value in entries :
+
+        if nominal [col] :
+          code = self.lookups [col].get ( value, -2 )
+
+          if code == -2 :
+            code = self.addCategory ( col, value )
+
+          number = np.nan if code < 0 else float (code)
+        else :
+          value  = cleanValue (value)
+          number = np.nan if value == "?" else float (value)
+
+        if number != 0.0 :
+          data.append (number)
+          indices.append (col)
+
+      indptr.append ( len (indices) )
+
+    self.nr = len (indptr) - 1
+
+    weightArr = None
+
+    if self.weight :
+      weightArr = np.ones ( self.nr, dtype = np.float64 )
+
+      for idx, value in weights.items () :
+        weightArr [idx] = value
+
+    return ( np.frombuffer ( data, dtype = np.float64 ),
+             np.frombuffer ( indices, dtype = np.int32 ),
+             np.frombuffer ( indptr, dtype = np.int64 ), weightArr )
@@ -4,7 +4,9 @@
 #
 #  Description :
 #
-#   This module contains test cases for the class 'ArffConv'.
+#   This module contains test cases for the class 'ArffConv'.  The files
+#   are written into a temporary directory,  the files of the cases 1 to 5
+#   are compared with the expected files in the directory 'Test'.
 #
 #
 #  Developer : Oskar Leirich                Creation date : 16.Jan.2023
@@ -13,84 +15,272 @@
 #
 # -------------------------------------------------------------------------
 
+import filecmp
+import os
+import shutil
+import tempfile
+
 import ArffConv
 
 arff = ArffConv.ArffConv ()
 
-# several test cases
-testcases = [ 1, 2, 3, 4 ]
-testcases = [ 4 ]
+outDir = tempfile.mkdtemp ( prefix = "ArffTest_" )
+
+
+# path of a file written by a test case
+
+def output ( name : str ) -> str :
+
+  return os.path.join ( outDir, name )
+
+
+# compare the written files with the expected files in 'Test'
+
+def compare ( *names ) :
+
+  for name in names :
+    expected = os.path.join ( "Test", name )
+    assert filecmp.cmp ( output (name), expected, shallow = False ), name
+
+# several test cases, the cases from 6 on check their results by assert
+testcases = [ 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14 ]
 
 if ( 1 in testcases ) :    # weather data
   arff.setFileName ( "Data/weather.arff" )
   arff.loadArff ()
-  arff.saveDataFrame ( "Test/weather.csv" )
+  arff.saveDataFrame ( output ( "weather.csv" ) )
   arff.setDescription ( "Just a test data set" )
-  arff.saveArff ( "Test/weather-1.arff" )
+  arff.saveArff ( output ( "weather-1.arff" ) )
 
   df = arff.getDataFrame ()
   arff.setDataFrame (df)
 
-  arff.saveDataFrame ( "Test/weather-df.csv" )
+  arff.saveDataFrame ( output ( "weather-df.csv" ) )
 
-  arff.saveArff ( "Test/weather-from-df.arff" )
+  arff.saveArff ( output ( "weather-from-df.arff" ) )
+
+  compare ( "weather.csv", "weather-1.arff", "weather-df.csv",
+            "weather-from-df.arff" )
 
 if ( 2 in testcases ) :    # test with simple data time
   arff.setFileName ( "Data/DataTime.arff" )
   arff.loadArff ()
-  arff.saveDataFrame ( "Test/DataTime.csv" )
+  arff.saveDataFrame ( output ( "DataTime.csv" ) )
 
   df = arff.getDataFrame ()
   arff.setDataFrame (df)
 
-  arff.saveDataFrame ( "Test/DataTime-from-df.csv" )
+  arff.saveDataFrame ( output ( "DataTime-from-df.csv" ) )
+
+  arff.saveArff ( output ( "DataTime-from-df.arff" ) )
 
-  arff.saveArff ( "Test/DataTime-from-df.arff" )
+  compare ( "DataTime.csv", "DataTime-from-df.csv", "DataTime-from-df.arff" )
 
 if ( 3 in testcases ) :    # test with dates and times
   arff.setFileName ( "Data/DateMay.arff" )
   arff.loadArff ()
-  arff.saveDataFrame ( "Test/DateMay.csv" )
+  arff.saveDataFrame ( output ( "DateMay.csv" ) )
 
   df = arff.getDataFrame ()
   arff.setDataFrame (df)
 
-  arff.saveDataFrame ( "Test/DateMay-df.csv" )
-  arff.saveArff ( "Test/DateMay-3.arff" )
+  arff.saveDataFrame ( output ( "DateMay-df.csv" ) )
+  arff.saveArff ( output ( "DateMay-3.arff" ) )
 
   arff.setAttributeType ( "Date",      "DATE dd.MM.yyyy" )
   arff.setAttributeType ( "Sunrise",   "DATE HH:mm" )
   arff.setAttributeType ( "Sunset",    "DATE dd-MM-yyyy HH:mm" )
   arff.setAttributeType ( "Daylength", "DATE HH:mm" )
+  assert arff.getData () [0].startswith ( "01.05.2022," )    # new format
 
-  arff.saveDataFrame ( "Test/DateMay-attr.csv" )
-  arff.saveArff ( "Test/DateMay-attr.arff" )
+  arff.saveDataFrame ( output ( "DateMay-attr.csv" ) )
+  arff.saveArff ( output ( "DateMay-attr.arff" ) )
+
+  compare ( "DateMay.csv", "DateMay-df.csv", "DateMay-3.arff",
+            "DateMay-attr.csv", "DateMay-attr.arff" )
 
 if ( 4 in testcases ) :    # iris data set with weight and sparse matrix
   arff.setFileName ( "Data/iris-weight.arff" )
   arff.loadArff ()
-  arff.saveDataFrame ( "Test/iris-weight.csv" )
+  arff.saveDataFrame ( output ( "iris-weight.csv" ) )
   arff.setDescription ( "No more a sparse data set" )
-  arff.saveArff ( "Test/iris-normal.arff" )
+  arff.saveArff ( output ( "iris-normal.arff" ) )
 
   df = arff.getDataFrame ()
   arff.setDataFrame (df)
 
-  arff.saveDataFrame ( "Test/iris-normal-df.csv" )
+  arff.saveDataFrame ( output ( "iris-normal-df.csv" ) )
+
+  arff.saveArff ( output ( "iris-from_df.arff" ) )
 
-  arff.saveArff ( "Test/iris-from_df.arff" )
+  compare ( "iris-weight.csv", "iris-normal.arff", "iris-normal-df.csv",
+            "iris-from_df.arff" )
 
 if ( 5 in testcases ) :    # weather data with quotes attributes
   arff.setFileName ( "Data/weather_sep.arff" )
   arff.loadArff ()
-  arff.saveDataFrame ( "Test/weather_sep.csv" )
+  arff.saveDataFrame ( output ( "weather_sep.csv" ) )
   arff.setDescription ( "Just a test data set" )
-  arff.saveArff ( "Test/weather_sep-1.arff" )
+  arff.saveArff ( output ( "weather_sep-1.arff" ) )
 
   df = arff.getDataFrame ()
   arff.setDataFrame (df)
 
-  arff.saveDataFrame ( "Test/weather_sep-df.csv" )
+  arff.saveDataFrame ( output ( "weather_sep-df.csv" ) )
+
+  arff.saveArff ( output ( "weather_sep-from-df.arff" ) )
+
+  compare ( "weather_sep.csv", "weather_sep-1.arff", "weather_sep-df.csv",
+            "weather_sep-from-df.arff" )
+
+if ( 6 in testcases ) :    # iris data set read in chunks
+  arff.setFileName ( "Data/weather.arff" )
+  arff.loadArff ()
+
+  arff.setFileName ( "Data/iris-weight.arff" )
+
+  chunks = list ( arff.iterDataFrames ( chunksize = 20, withWeight = True ) )
+  assert [ len (df) for df in chunks ] == [ 20, 20, 16 ]
+  assert [ df.index [0] for df in chunks ] == [ 0, 20, 40 ]
+
+  # every chunk has the types of the header, not of its values
+  for df in chunks :
+    assert df.dtypes.equals ( chunks [0].dtypes )
+    assert list ( df ["class"].cat.categories ) == \
+           [ "Iris-setosa", "Iris-versicolor", "Iris-virginica" ]
+
+  with open ( output ( "chunks.arff" ), "w" ) as hfile :    # missing values later
+    hfile.write ( "@relation chunks\n@attribute a integer\n"
+                  "@attribute b numeric\n@attribute c {x,y,z}\n@data\n"
+                  "1,2,x\n2,3,x\n?,4.5,y\n4,?,?\n" )
+
+  arff.setFileName ( output ( "chunks.arff" ) )
+  chunks = list ( arff.iterDataFrames ( chunksize = 2 ) )
+  assert [ str (dtype) for dtype in chunks [1].dtypes ] == \
+         [ "Int64", "float64", "category" ]
+  assert chunks [0].dtypes.equals ( chunks [1].dtypes )
+  assert arff.getDataFrame ().shape == ( 14, 5 )    # loaded data is kept
+
+if ( 7 in testcases ) :    # iris data set loaded as sparse matrix
+  arff.setFileName ( "Data/iris-weight.arff" )
+  arff.loadArff ( sparse = True )
+  mat, weights = arff.getSparseMatrix (), arff.getWeights ()
+  print ( mat.shape, mat.nnz )
+
+  assert "weight" not in arff.getDataFrame ().columns
+  arff.saveArff ( output ( "iris-sparse-dense.arff" ) )    # dense save, labels and weights
+
+  arff.setFileName ( output ( "iris-sparse-dense.arff" ) )
+  arff.loadArff ( sparse = True )
+  assert ( arff.getSparseMatrix () != mat ).nnz == 0
+  assert ( arff.getWeights () == weights ).all ()
+
+  arff.loadArff ( sparse = "csr", columns = [ "petalwidth", "class" ] )
+  assert arff.getData () [2] == "0.2,Iris-setosa, {0.4}"
+
+if ( 8 in testcases ) :    # cache entries depend on the load options
+  arff.setCacheDir ( output ( "cache" ) )
+  arff.setFileName ( "Data/iris.arff" )
+
+  arff.loadArff ( downcast = True )     # stored with float32 values
+  assert arff.getDataFrame () ["sepallength"].dtype == "float32"
+  arff.loadArff ()
+  assert arff.getDataFrame () ["sepallength"].dtype == "float64"
+  full = arff.getDataFrame ().copy ()
+  arff.loadArff ()                        # now from the cache
+  assert arff.getDataFrame ().equals (full)
+  assert full ["sepallength"].iloc [0] == 5.1
+
+  arff.setCacheDir ( "" )
+
+if ( 9 in testcases ) :    # empty data section, parallel and serial load
+  from ArffIndex import ArffIndex
+
+  with open ( "Data/iris.arff", "rb" ) as hfile :
+    offset = ArffIndex.findDataOffset (hfile)
+    hfile.seek (0)
+    header = hfile.read (offset)
+
+  with open ( output ( "iris-empty.arff" ), "wb" ) as hfile :
+    hfile.write (header)
+
+  arff.setFileName ( output ( "iris-empty.arff" ) )
+
+  for workers in ( 1, 2 ) :
+    assert arff.loadArff ( workers = workers, engine = "python" )
+    df = arff.getDataFrame ()
+    assert df.shape == ( 0, 5 )
+    assert df ["sepallength"].dtype == "float64"
+    assert list ( df ["class"].cat.categories ) == \
+           [ "Iris-setosa", "Iris-versicolor", "Iris-virginica" ]
+
+if ( 10 in testcases ) :   # iterate rows while the loaded data is kept
+  arff.setFileName ( "Data/weather.arff" )
+  arff.loadArff ()
+  shape = arff.getDataFrame ().shape
+
+  with open ( output ( "quoted.arff" ), "w" ) as hfile :
+    hfile.write ( "@relation quoted\n@attribute name string\n"
+                  "@attribute size numeric\n@data\n"
+                  "'Smith, John',3\n\"it's\",4\n" )
+
+  arff.setFileName ( output ( "quoted.arff" ) )
+  rows = list ( arff.iterRows () )
+  assert rows == [ [ "Smith, John", "3" ], [ "it's", "4" ] ]
+  assert arff.getDataFrame ().shape == shape
+
+if ( 11 in testcases ) :   # csv engines and parallel parser equal the parser
+  try :
+    import pyarrow
+    engines = [ "c", "pyarrow" ]
+  except ImportError :
+    engines = [ "c" ]
+
+  for name in ( "weather.arff", "weather_sep.arff", "iris.arff",
+                "iris-weight.arff", "DataTime.arff", "DateMay.arff" ) :
+    arff.setFileName ( "Data/" + name )
+    arff.loadArff ( engine = "python" )
+    expected = arff.getDataFrame ()
+
+    for options in [ { "engine" : engine } for engine in engines ] + \
+                   [ { "workers" : 2 } ] :
+      arff.loadArff ( **options )
+      assert arff.getDataFrame ().equals (expected), ( name, options )
+
+if ( 12 in testcases ) :   # a data list set by setData is saved as it is
+  arff.setFileName ( "Data/weather.arff" )
+  arff.loadArff ()
+  arff.setData ( [ "sunny,70.0,80.0,TRUE,yes" ] )
+  arff.saveArff ( output ( "weather-set-data.arff" ) )
+
+  arff.setFileName ( output ( "weather-set-data.arff" ) )
+  arff.loadArff ()
+  assert arff.getData () == [ "sunny,70.0,80.0,TRUE,yes" ]
+
+if ( 13 in testcases ) :   # sparse save keeps False of a bool column
+  import pandas as pd
+
+  arff.setDataFrame ( pd.DataFrame ( { "x" : [ 0.0, 1.5, 0.0 ],
+                                       "b" : [ True, False, False ] } ) )
+  arff.saveArff ( output ( "bool-sparse.arff" ), sparse = True )
+
+  arff.setFileName ( output ( "bool-sparse.arff" ) )
+  arff.loadArff ()
+  df = arff.getDataFrame ()
+  assert df ["x"].tolist () == [ 0.0, 1.5, 0.0 ]
+  assert df ["b"].tolist () == [ "True", "False", "False" ]
+
+if ( 14 in testcases ) :   # truncated compressed file is reported, no exception
+  import gzip
+
+  with open ( "Data/iris.arff", "rb" ) as hfile :
+    data = gzip.compress ( hfile.read () )
+
+  with open ( output ( "iris-cut.arff.gz" ), "wb" ) as hfile :
+    hfile.write ( data [ : len (data) // 2 ] )
 
-  arff.saveArff ( "Test/weather_sep-from-df.arff" )
+  arff.setFileName ( output ( "iris-cut.arff.gz" ) )
+  assert not arff.loadArff ()
+  assert list ( arff.iterRows () ) == []
 
+shutil.rmtree ( outDir, ignore_errors = True )
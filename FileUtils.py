@@ -9,6 +9,10 @@
 #   array in several  orientations. It contains also  functions to check
 #   the file type, files and a lot of more.
 #
+#   Files compressed with gzip, bz2 or xz are  read and written transpa-
+#   rently, the codec is taken from the magic bytes of an existing file or
+#   from the extension (.gz, .bz2, .xz).
+#
 #  Developer : Oskar Leirich                Creation date : 11.Dec.2016
 #  Modified  : Oskar Leirich                Last changes  : 18.Jan.2023
 #
@@ -16,19 +20,38 @@
 #  This class contains following member functions :
 #   of FileUtils :
 #    FileUtils                 ~FileUtils                cleanFileName
-#    findFile                  getBaseNames
+#    findFile                  getBaseNames              getCompression
 #    getFile                   getFileName               getSize
-#    readFile                  readLine                  setFileName
-#    writeFile
+#    iterLines                 openFile                  readFile
+#    readLine                  setFileName               writeFile
+#
+#   of LineStream :
+#    LineStream                nextLine                  read
+#    readable                  readline
 #
 #-------------------------------------------------------------------------
 
+import bz2
 import fnmatch
+import gzip
+import io
+import lzma
 import os
 import os.path
+import zlib
 import StringUtils as strUtils
 
 
+# magic bytes and extensions of the supported compressions
+_COMPRESSIONS = { "gzip" : ( b"\x1f\x8b",         ".gz"  ),
+                  "bz2"  : ( b"BZh",              ".bz2" ),
+                  "xz"   : ( b"\xfd7zXZ\x00",     ".xz"  ) }
+
+# errors of reading a file, also of truncated or corrupt compressed files
+READ_ERRORS = ( FileNotFoundError, PermissionError, OSError, EOFError,
+                lzma.LZMAError, zlib.error )
+
+
 #-------------------------------------------------------------------------
 #
 #  Class Name   :  FileUtils.cpp
@@ -92,6 +115,96 @@ class FileUtils (object) :
     return foundList
 
 
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  getCompression  of  FileUtils
+  #
+  #  Description :
+  #
+  #   This function returns the compression of the given file : "gzip",
+  #   "bz2", "xz" or None for a plain file.  An existing file is checked by
+  #   its magic bytes (if 'checkContent' is set), otherwise the extension
+  #   decides.
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def getCompression ( fileName : str, checkContent : bool = True ) -> str :
+
+    if checkContent and os.path.isfile (fileName) :
+      try :
+        with open ( fileName, "rb" ) as hfile :
+          magic = hfile.read (6)
+
+        for name, ( signature, extension ) in _COMPRESSIONS.items () :
+          if magic.startswith (signature) :
+            return name
+
+        return None
+
+      except OSError :
+        pass
+
+    for name, ( signature, extension ) in _COMPRESSIONS.items () :
+      if fileName.lower ().endswith (extension) :
+        return name
+
+    return None
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  openFile  of  FileUtils
+  #
+  #  Description :
+  #
+  #   This function opens a plain or compressed file (see getCompression)
+  #   like 'open'.  Text modes use utf8, binary modes ("rb", "wb") return
+  #   the decompressed bytes.  Files are read by their content and written
+  #   by their extension.
+  #
+  #  Input parameter  :
+  #   fileName        : name of the file
+  #   mode            : "r", "w", "a", "rb", "wb" or "ab"
+  #   compressLevel   : level of the compression when writing, None is the
+  #                     default of the codec ( gzip and bz2 : 1 - 9, xz :
+  #                     preset 0 - 9 )
+  #
+  #-------------------------------------------------------------------------
+
+  @staticmethod
+  def openFile ( fileName : str, mode : str = "r",
+                 compressLevel : int = None ) :
+
+    binary  = "b" in mode
+    reading = mode.startswith ( "r" )
+
+    compression = FileUtils.getCompression ( fileName, reading )
+
+    if compression is None :
+      if binary :
+        return open ( fileName, mode )
+
+      return open ( fileName, mode, encoding = "utf8" )
+
+    mode    = mode.replace ( "b", "" ) + ( "b" if binary else "t" )
+    options = {} if binary else { "encoding" : "utf8" }
+
+    if ( compressLevel is not None ) and not reading :
+      if compression == "xz" :
+        options ["preset"] = compressLevel
+      else :
+        options ["compresslevel"] = compressLevel
+
+    if compression == "gzip" :
+      return gzip.open ( fileName, mode, **options )
+
+    if compression == "bz2" :
+      return bz2.open ( fileName, mode, **options )
+
+    return lzma.open ( fileName, mode, **options )
+
+
   #-------------------------------------------------------------------------
   #
   #  Member function :  closeFile  of  FileUtils
@@ -139,7 +252,7 @@ class FileUtils (object) :
     content = []
 
     try :
-      self.hfile = open ( self.fileName, "r", encoding = "utf8" )
+      self.hfile = self.openFile ( self.fileName, "r" )
 
       content = self.hfile.readlines ()
 
@@ -154,13 +267,59 @@ class FileUtils (object) :
 
       return True, content
 
-    except ( FileNotFoundError, PermissionError, OSError ) :
+    except READ_ERRORS :
+      self.closeFile ()
       msg = "Cannot open file : " + self.fileName + " for reading !"
       print (msg)
 
     return False, content
 
 
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  iterLines  of  FileUtils
+  #
+  #  Description :
+  #
+  #   This function  is a  generator which  reads the text  file line  by
+  #   line and yields every line.  Different to 'readFile' the content is
+  #   never kept completely in memory.  A truncated or corrupt compressed
+  #   file is reported and ends the lines.
+  #
+  #  Input parameter  :
+  #   chomp_nl        : true - remove trailing newlines
+  #
+  #  Output parameter :
+  #   (str)           : next line of the file
+  #
+  #-------------------------------------------------------------------------
+
+  def iterLines ( self, chomp_nl : bool = True ) :
+
+    try :
+      hfile = self.openFile ( self.fileName, "r" )
+
+    except ( FileNotFoundError, PermissionError, OSError ) :
+      msg = "Cannot open file : " + self.fileName + " for reading !"
+      print (msg)
+
+      return
+
+    with hfile :
+      try :
+        for line in hfile :
+
+          if chomp_nl :        # remove trailing newlines
+            line = line.rstrip ( "\n" )
+
+          yield line
+
+      except READ_ERRORS :
+        msg = "Cannot read file : " + self.fileName + " , the data is " + \
+              "truncated or corrupt !"
+        print (msg)
+
+
   #-------------------------------------------------------------------------
   #
   #  Member function :  writeFile  of  FileUtils
@@ -168,12 +327,16 @@ class FileUtils (object) :
   #  Description :
   #
   #   This function writes  the given string list as a  text file with the
-  #   name given to self class when creating it.
+  #   name given to self class when creating it.  The content can also be
+  #   an iterator (e.g. generator), the lines are then written as they are
+  #   produced.  The given list is not changed.  A file name with the ex-
+  #   tension .gz, .bz2 or .xz is written compressed (see openFile).
   #
   #  Input parameter  :
-  #   content         : String list containing all lines of the file
+  #   content         : String list or iterator with all lines of the file
   #   append          : Open in AppendMode (True) or WriteOnly (default)
   #   with_nl         : add new line to every string before writing it
+  #   compressLevel   : level of the compression, None is the default
   #
   #  Output parameter :
   #   success         : Success, true or false
@@ -181,20 +344,17 @@ class FileUtils (object) :
   #------------------------------------------------------------------------
 
   def writeFile ( self, content : list, append : bool = False,
-                  with_nl : bool = True ) -> bool :
+                  with_nl : bool = True, compressLevel : int = None ) -> bool :
 
     try :
 
       if append :
-        self.hfile = open ( self.fileName, "a", encoding = "utf8" )
+        self.hfile = self.openFile ( self.fileName, "a", compressLevel )
       else :
-        self.hfile = open ( self.fileName, "w", encoding = "utf8" )
-
-      if with_nl :        # remove trailing newlines
-        for idx in range ( 0, len (content) ) :
+        self.hfile = self.openFile ( self.fileName, "w", compressLevel )
 
-          line = content [idx] + "\n"
-          content [idx] = line
+      if with_nl :        # add trailing newlines
+        content = ( line + "\n" for line in content )
 
       self.hfile.writelines (content)
 
@@ -227,3 +387,129 @@ class FileUtils (object) :
     self.fileName = fileName
 
     self.closeFile ()    # close if open
+
+
+#-------------------------------------------------------------------------
+#
+#  Class Name   :  LineStream
+#
+#  Description :
+#
+#   This class is a read-only text file object over a string list or an
+#   iterator of lines.  The lines are joined only when they are read, so
+#   functions which expect a file (e.g. 'pd.read_csv') can read the lines
+#   without writing a temporary file and without a copy of all lines.
+#
+#   Example :
+#    df = pd.read_csv ( LineStream ( [ "a,b", "1,2", "3,4" ] ) )
+#
+#-------------------------------------------------------------------------
+
+class LineStream ( io.TextIOBase ) :
+
+  def __init__ ( self, lines, with_nl : bool = True ) :
+
+    self.lines   = iter (lines)
+    self.with_nl = with_nl      # add a newline to every line
+    self.buffer  = ""           # text read but not yet returned
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readable  of  LineStream
+  #
+  #  Description :
+  #
+  #   This function returns always true, the stream can be read.
+  #
+  #-------------------------------------------------------------------------
+
+  def readable (self) -> bool :
+
+    return True
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  nextLine  of  LineStream
+  #
+  #  Description :
+  #
+  #   This function returns the next line of the iterator, an empty string
+  #   at the end.
+  #
+  #-------------------------------------------------------------------------
+
+  def nextLine (self) -> str :
+
+    line = next ( self.lines, None )
+
+    if line is None :
+      return ""
+
+    return line + "\n" if self.with_nl else line
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  read  of  LineStream
+  #
+  #  Description :
+  #
+  #   This function returns  the next 'size' characters, all remaining
+  #   characters if size is negative or None.
+  #
+  #-------------------------------------------------------------------------
+
+  def read ( self, size = -1 ) -> str :
+
+    chunks = [ self.buffer ]
+    length = len (self.buffer)
+
+    while ( size is None ) or ( size < 0 ) or ( length < size ) :
+      line = self.nextLine ()
+
+      if not line :
+        break
+
+      chunks.append (line)
+      length = length + len (line)
+
+    text = "".join (chunks)
+
+    if ( size is None ) or ( size < 0 ) :
+      self.buffer = ""
+      return text
+
+    self.buffer = text [ size : ]
+
+    return text [ : size ]
+
+
+  #-------------------------------------------------------------------------
+  #
+  #  Member function :  readline  of  LineStream
+  #
+  #  Description :
+  #
+  #   This function returns the next line including the newline.
+  #
+  #-------------------------------------------------------------------------
+
+  def readline ( self, size = -1 ) -> str :
+
+    if not self.buffer :
+      self.buffer = self.nextLine ()
+
+    idx = self.buffer.find ( "\n" ) + 1
+
+    if idx <= 0 :
+      idx = len (self.buffer)
+
+    if ( size is not None ) and ( size >= 0 ) :
+      idx = min ( idx, size )
+
+    line        = self.buffer [ : idx ]
+    self.buffer = self.buffer [ idx : ]
+
+    return line
@@ -452,7 +452,7 @@ class MatrixBase :
   #  Description :
   #
   #   This function reads the matrix in a tabular form from the given text
-  #   file.
+  #   file, also compressed (see FileUtils.openFile).
   #
   #  Input parameters   :
   #   fileName          :  Name of the text file
@@ -472,7 +472,7 @@ class MatrixBase :
 
     ok, lines = fileUtils.readFile ()
 
-    if not ok () :
+    if not ok :
       msg = "Matrix read : cannot read from file " + fileName
       print (msg)
 
@@ -500,8 +500,8 @@ class MatrixBase :
 
       return False
 
-    rows = int ( parts [1] )
-    cols = int ( parts [2] )
+    rows = int ( parts [1].split () [0] )    # e.g. "3 rows"
+    cols = int ( parts [2].split () [0] )
 
     self.reset ( rows, cols )
 
@@ -515,15 +515,17 @@ class MatrixBase :
   #  Description :
   #
   #   This function writes the matrix in  a tabular form to the given text
-  #   file.
+  #   file, compressed for the extension .gz, .bz2 or .xz.
   #
   #  Input parameters   :
   #   fileName          :  Name of the text file
   #   title             :  Title of the matrix
+  #   compressLevel     :  Level of the compression, None is the default
   #
   #-------------------------------------------------------------------------*/
 
-  def write ( self, fileName : str, append : bool = False ) -> bool :
+  def write ( self, fileName : str, append : bool = False,
+              compressLevel : int = None ) -> bool :
 
     lines : list
 
@@ -542,6 +544,6 @@ class MatrixBase :
 
     fileUtils.setFileName (fileName)
 
-    ok = fileUtils.writeFile ( lines, append )
+    ok = fileUtils.writeFile ( lines, append, compressLevel = compressLevel )
 
     return ok
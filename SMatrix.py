@@ -28,9 +28,7 @@
 
 from __future__ import annotations
 
-import re
 from MatrixBase import MatrixBase
-import StringUtils as strUtils
 
 #-------------------------------------------------------------------------
 #
@@ -453,56 +451,6 @@ class SMatrix (MatrixBase) :
       self.setValue ( i, index, text )
 
 
-  #-------------------------------------------------------------------------
-  #
-  #  Member function :  getColType  of  SMatrix
-  #
-  #  Description :
-  #
-  #   This function returns  the type of the column values  with the given
-  #   index as  string. The type can  be integer, float, string  or string
-  #   list of unique string values (categorical).
-  #
-  #  Input parameters  :
-  #   index            :  Index of the wanted column
-  #
-  #  Output parameters :
-  #   (QStringList)    :  Column values as string list
-  #
-  #-------------------------------------------------------------------------
-
-  def getColType (  self, coln : int ) -> list :
-
-    colTypes = []
-
-    regex = re.compile ( "\d+:\d+" )
-
-    for i in range ( 0, self.nr ) :
-
-      text = self.getValue ( i, coln )
-
-      while (1) :
-        if strUtils.isInt (text) :
-          if ( not "int" in colTypes ) :
-            colTypes.append ( "int" )
-          break
-
-        if strUtils.isFloat (text) :
-          if ( not "float" in colTypes ) :
-            colTypes.append ( "float" )
-          break
-
-        if regex.search (text) :   # check for a time string
-          text = "Time"
-
-        if ( not text in colTypes ) :
-          colTypes.append (text)
-
-        break
-
-    return colTypes
-
-
   #-------------------------------------------------------------------------
   #
   #  Member function :  getRow  of  SMatrix
@@ -11,13 +11,27 @@
 #
 #  This unit contains following functions :
 #   of StringUtils :
-#    chomp                replace
+#    chomp                classifyValues       getColumnTypes
+#    matchColumnTypes     replace
 #
 #-------------------------------------------------------------------------
 
 import re
 import csv
 
+import numpy as np
+import pandas as pd
+
+
+# same grammar as python's int () and float () (with '_' separators)
+_DIGITS     = r"\d(?:_?\d)*"
+_INT_REGEX  = re.compile ( r"\s*[+-]?" + _DIGITS + r"\s*" )
+_FLOAT_REGEX = re.compile ( r"\s*[+-]?(?:(?:" + _DIGITS + r"(?:\.(?:" +
+                            _DIGITS + r")?)?|\." + _DIGITS + r")(?:[eE][+-]?" +
+                            _DIGITS + r")?|nan|inf|infinity)\s*",
+                            re.IGNORECASE )
+_TIME_REGEX = re.compile ( r"\d+:\d+" )
+
 
 #-------------------------------------------------------------------------
 #
@@ -45,6 +59,132 @@ def chomp ( inStr : str, trail : str = "\n" ) -> str :
   return outStr
 
 
+#-------------------------------------------------------------------------
+#
+#  Function name :  classifyValues  of  StringUtils
+#
+#  Description :
+#
+#   This function returns the type of every value of the given string
+#   series as object array.  Integer values give "int", floating point
+#   values "float", time strings "Time" and any other value itself.  The
+#   compiled regular expressions run on the pandas string functions
+#   instead of a try / except per value,  every expression only on the
+#   values not yet classified.
+#
+#-------------------------------------------------------------------------
+
+def classifyValues ( text ) -> np.ndarray :
+
+  types = text.to_numpy ().astype (object)
+  rest  = np.arange ( len (text) )
+
+  for name, regex, full in ( ( "int",   _INT_REGEX,   True  ),
+                             ( "float", _FLOAT_REGEX, True  ),
+                             ( "Time",  _TIME_REGEX,  False ) ) :
+    if not len (rest) :
+      break
+
+    part  = text.iloc [rest]
+    found = ( part.str.fullmatch (regex) if full else
+              part.str.contains (regex) ).to_numpy ( dtype = bool )
+
+    types [ rest [found] ] = name
+    rest = rest [ ~ found ]
+
+  return types
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  getColumnTypes  of  StringUtils
+#
+#  Description :
+#
+#   This function classifies the values of a column and returns the
+#   distinct types in the order of their first appearance (see
+#   classifyValues).  Only the distinct values are checked, in blocks.
+#   With 'maxDistinct' the classification stops as soon as there are more
+#   distinct types,  e.g. for a column of names after the first block.
+#
+#  Input parameter  :
+#   values          : column values as string list or array
+#   maxDistinct     : more distinct types give ["string"] ( 0 = no limit )
+#   blockSize       : number of distinct values classified at once
+#
+#  Output parameter :
+#   (list)          : list of distinct types
+#
+#-------------------------------------------------------------------------
+
+def getColumnTypes ( values, maxDistinct : int = 0,
+                     blockSize : int = 65536 ) -> list :
+
+  uniques = pd.unique ( np.asarray ( values, dtype = object ) )
+  text    = pd.Series ( uniques, dtype = object ).astype (str)
+
+  colTypes = {}    # ordered like a list, fast lookup
+
+  for start in range ( 0, len (text), blockSize ) :
+    block = text.iloc [ start : start + blockSize ]
+
+    colTypes.update ( dict.fromkeys ( pd.unique ( classifyValues (block) ) ) )
+
+    if maxDistinct and len (colTypes) > maxDistinct :
+      return [ "string" ]
+
+  return list (colTypes)
+
+
+#-------------------------------------------------------------------------
+#
+#  Function name :  matchColumnTypes  of  StringUtils
+#
+#  Description :
+#
+#   This function checks if all values of a column have one of the given
+#   candidate types (e.g. the types of a sample, see getColumnTypes).  Values
+#   equal to a candidate category need no regular expression, the others
+#   are classified in blocks and the check stops with the first block
+#   which contains a value of another type.
+#
+#  Input parameter  :
+#   values          : column values as string list or array
+#   colTypes        : candidate types
+#   blockSize       : number of distinct values classified at once
+#
+#  Output parameter :
+#   (list)          : distinct types in the order of their first appearance
+#                     (like getColumnTypes) or None if a value does not fit
+#
+#-------------------------------------------------------------------------
+
+def matchColumnTypes ( values, colTypes : list,
+                       blockSize : int = 65536 ) -> list :
+
+  uniques = pd.unique ( np.asarray ( values, dtype = object ) )
+
+  text  = pd.Series ( uniques, dtype = object ).astype (str)
+  types = text.to_numpy ().copy ()
+
+  # a value equal to a category is its own type
+  labels = [ colType for colType in colTypes
+             if colType not in ( "int", "float", "Time" ) ]
+  rest   = np.flatnonzero ( ~ text.isin (labels).to_numpy () )
+  known  = set (colTypes)
+
+  for start in range ( 0, len (rest), blockSize ) :
+    block  = rest [ start : start + blockSize ]
+    blockTypes = classifyValues ( text.iloc [block] )
+
+    if not known.issuperset ( pd.unique (blockTypes) ) :
+      return None
+
+    types [block] = blockTypes
+
+  return pd.unique (types).tolist ()
+
+
 #-------------------------------------------------------------------------
 #
 #  Function name :  getDelimiter